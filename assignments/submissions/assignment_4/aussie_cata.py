@@ -1,4 +1,12 @@
+import sys
+from pathlib import Path
+
 import spacy
+
+sys.path.append(str(Path(__file__).resolve().parents[3] / "scripts"))
+from glove_store import load_glove
+from soft_dictionary import soft_dictionary_scores
+
 nlp = spacy.load("en_core_web_sm")
 
 # Download stopwords
@@ -127,6 +135,14 @@ text_dataframe['innov_ws'], text_dataframe['innov_perwd_ws'] = zip(
     *text_dataframe['preprocessed_ws'].apply(lambda tokens: calculate_innovativeness_metrics(tokens, inno_dict))
 )
 
+# Soft innovativeness: similarity between each text's TF-IDF-weighted average
+# GloVe vector and the average vector of the (single-word) dictionary entries
+glove_file_path = "local_data/glove.6B.100d.txt"
+soft_scores = soft_dictionary_scores(
+    load_glove(glove_file_path), text_dataframe['preprocessed_ws'].tolist(), {"innov": inno_dict}
+)
+text_dataframe['innov_soft_ws'] = soft_scores["innov"].to_numpy()
+
 # Save to CSV
 innov_csv = "assignments/submissions/assignment_4/innov_aussie_data.csv"
 text_dataframe.to_csv(innov_csv, index=False)
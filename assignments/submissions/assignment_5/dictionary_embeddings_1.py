@@ -1,12 +1,17 @@
+import sys
 import numpy as np
 import csv
 from pathlib import Path
-from gensim.models import KeyedVectors
-from scipy.spatial.distance import cosine
 from docx import Document
 from pprint import pprint
 from itertools import combinations
 
+sys.path.append(str(Path(__file__).resolve().parents[3] / "scripts"))
+from embedding_ann import load_index
+from embedding_similarity import (leave_one_out, pairwise_similarities, rank_candidates,
+                                  unit_rows, word_rows)
+from glove_store import load_glove, load_subset
+
 # Paths setup
 local_data_path = Path(__file__).resolve().parent.parent.parent.parent / "local_data"
 glove_file_path = local_data_path / "glove.6B.100d.txt"
@@ -14,10 +19,12 @@ output_docx_path = "assignments/submissions/assignment_5/word_embedding_results.
 article_preprint_path = "assignments/materials/week_4/article_preprint.txt"
 output_csv_path = "assignments/submissions/assignment_5/word_list_for_evaluation.csv"
 
-# Load GloVe embeddings
+# Compare the approximate deductive list with exact search (scans the whole store)
+CHECK_RECALL = False
+
+# Load GloVe embeddings (converted to a memory-mapped binary store on first use)
 print("Loading GloVe model...")
-embeddings = KeyedVectors.load_word2vec_format(
-    glove_file_path.as_posix(), binary=False, no_header=True)
+embeddings = load_glove(glove_file_path)
 
 # Define root words
 root_words = ["entrepreneurial", "creative", "innovative", "trailblazing"]
@@ -36,10 +43,12 @@ for word in root_words:
 document = Document()
 document.add_heading("Word Embedding Analysis Results", level=1)
 
+# All pairs at once from the unit-length vectors
+root_similarities = pairwise_similarities(embeddings, root_words)
 cosine_similarities = []
 for idx, (i, j) in enumerate(combinations(range(len(root_words)), 2), 1):
     word1, word2 = root_words[i], root_words[j]
-    similarity = 1 - cosine(embeddings[word1], embeddings[word2])
+    similarity = float(root_similarities[i, j])
     cosine_similarities.append((word1, word2, similarity))
     print(f"Similarity between '{word1}' and '{word2}': {similarity:.4f}")
 
@@ -48,10 +57,8 @@ document.add_heading("Cosine Similarities Between Root Words", level=2)
 for word1, word2, similarity in cosine_similarities:
     document.add_paragraph(f"{word1} - {word2}: {similarity:.4f}")
 
-# Drop the least similar root word
-least_fitting_word = min(root_words, key=lambda w: sum(
-    1 - cosine(embeddings[w], embeddings[other]) for other in root_words if other != w
-))
+# Drop the least similar root word (lowest mean similarity to the others)
+least_fitting_word = root_words[int(np.argmin(leave_one_out(root_similarities)))]
 remaining_root_words = [w for w in root_words if w != least_fitting_word]
 
 # Save remaining root words to Word document
@@ -65,13 +72,17 @@ document.add_paragraph(str(average_vector[:5]))
 
 # Cosine similarity between average vector and each root word
 document.add_heading("Cosine Similarities with Average Vector", level=2)
-for word in remaining_root_words:
-    similarity = 1 - cosine(average_vector, embeddings[word])
+average_similarities = word_rows(embeddings, remaining_root_words) @ unit_rows(average_vector)[0]
+for word, similarity in zip(remaining_root_words, average_similarities):
     document.add_paragraph(f"{word}: {similarity:.4f}")
 
 # Deductive word list (50 most similar words)
 document.add_heading("Deductive Word List", level=2)
-deductive_word_list = embeddings.similar_by_vector(average_vector, topn=50)
+# Approximate nearest neighbours from an index saved beside the GloVe store
+glove_index = load_index(embeddings)
+deductive_word_list = glove_index.similar_by_vector(average_vector, topn=50)
+if CHECK_RECALL:
+    print(f"Deductive list recall against exact search: {glove_index.recall(average_vector, topn=50):.2f}")
 for word, score in deductive_word_list:
     document.add_paragraph(f"{word}: {score:.4f}")
 
@@ -79,15 +90,13 @@ for word, score in deductive_word_list:
 with open(article_preprint_path, "r", encoding="utf-8") as file:
     text = file.read().lower().split()
 
-# Identify 50 most similar words from article_preprint.txt
-unique_words_in_text = set(text).intersection(set(embeddings.key_to_index.keys()))
-inductive_word_list = []
-for word in unique_words_in_text:
-    similarity = 1 - cosine(average_vector, embeddings[word])
-    inductive_word_list.append((word, similarity))
+# Embeddings for just the article's vocabulary and the root words, stored beside the article
+corpus_embeddings = load_subset(glove_file_path, set(text) | set(root_words), article_preprint_path)
+print(f"Corpus subset: {len(corpus_embeddings):,} of {len(embeddings):,} GloVe words")
 
-# Sort and select top 50 words
-inductive_word_list = sorted(inductive_word_list, key=lambda x: x[1], reverse=True)[:50]
+# Identify 50 most similar words from article_preprint.txt (one matrix product)
+unique_words_in_text = sorted(set(text).intersection(corpus_embeddings.key_to_index))
+inductive_word_list = rank_candidates(corpus_embeddings, unique_words_in_text, average_vector, k=50)
 
 # Save inductive word list to the document
 document.add_heading("Inductive Word List", level=2)
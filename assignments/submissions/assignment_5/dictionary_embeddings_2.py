@@ -1,50 +1,44 @@
+import sys
 import numpy as np
 import csv
 import matplotlib.pyplot as plt
 from pathlib import Path
-from gensim.models import KeyedVectors
-from sklearn.manifold import TSNE
 from docx import Document
 from docx.shared import Inches
 import io
 
+sys.path.append(str(Path(__file__).resolve().parents[3] / "scripts"))
+from embedding_projection import plot_words, project_2d
+from glove_store import load_subset
+
 # Paths setup
 local_data_path = Path(__file__).resolve().parent.parent.parent.parent / "local_data"
 glove_file_path = local_data_path / "glove.6B.100d.txt"
 evaluated_word_list_path = "assignments/submissions/assignment_5/word_list_for_evaluation.csv"
 word_doc_path = "assignments/submissions/assignment_5/word_embeddings_results.docx"
 
-# Load GloVe embeddings
+# Read the evaluated word list
+with open(evaluated_word_list_path, mode='r', encoding='utf-8') as file:
+    rows = list(csv.DictReader(file))
+
+# Load GloVe embeddings for just the listed words (a subset stored beside the CSV,
+# built from the full GloVe store on first use)
 print("Loading GloVe model...")
-embeddings = KeyedVectors.load_word2vec_format(
-    glove_file_path.as_posix(), binary=False, no_header=True)
+embeddings = load_subset(glove_file_path, [row['word'] for row in rows], evaluated_word_list_path)
 
-# Load and filter evaluated word list
-included_words = []
-with open(evaluated_word_list_path, mode='r', encoding='utf-8') as file:
-    reader = csv.DictReader(file)
-    for row in reader:
-        if row['eval'] == '1' and row['word'] in embeddings:
-            included_words.append(row['word'])
+# Filter evaluated word list
+included_words = [row['word'] for row in rows if row['eval'] == '1' and row['word'] in embeddings]
 
 # Extract word vectors for the included words
 word_vectors = np.array([embeddings[word] for word in included_words])
 
-# Reduce dimensionality using t-SNE
-tsne = TSNE(n_components=2, perplexity=5, random_state=24601, max_iter=10000)
-reduced_vectors = tsne.fit_transform(word_vectors)
-
-# Create the plot
-plt.figure(figsize=(12, 8))
-
-for i, word in enumerate(included_words):
-    plt.scatter(reduced_vectors[i, 0], reduced_vectors[i, 1],c='blue', s=30)
-    plt.annotate(
-        word,
-        xy=(reduced_vectors[i, 0], reduced_vectors[i, 1]),
-        xytext=(5, 2),
-        textcoords='offset points',
-    )
+# Reduce dimensionality: PCA-initialised t-SNE that stops once it converges, or
+# PCA ("pca") / random projection ("random") for word lists too long for t-SNE
+projection_method = "tsne" if len(included_words) <= 5000 else "pca"
+reduced_vectors = project_2d(word_vectors, method=projection_method, perplexity=5)
+
+# Create the plot (all points in one scatter call)
+plot_words(included_words, reduced_vectors)
 
 # Save plot to bytes buffer
 img_buffer = io.BytesIO()
@@ -0,0 +1,95 @@
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+from sklearn.pipeline import Pipeline
+
+from ml_memory import compact_matrix
+
+
+# Grid search over a Pipeline([... featurizer steps ..., ('classifier', ...)]) that
+# only tunes the final step. Each fold's feature matrices are built once and
+# shared by every parameter candidate instead of being refit per candidate.
+def _featurize_fold(featurizer, x, y, train_idx, val_idx):
+    featurizer = clone(featurizer)
+    x_train = compact_matrix(featurizer.fit_transform(x[train_idx], y[train_idx]))
+    x_val = compact_matrix(featurizer.transform(x[val_idx]))
+    return x_train, y[train_idx], x_val, y[val_idx]
+
+
+def _score_candidate(classifier, params, fold, scorer):
+    x_train, y_train, x_val, y_val = fold
+    model = clone(classifier).set_params(**params)
+    start = time.perf_counter()
+    model.fit(x_train, y_train)
+    return scorer(model, x_val, y_val), time.perf_counter() - start
+
+
+class CachedGridSearchCV:
+    """Drop-in for GridSearchCV(pipeline, param_grid, cv=..., scoring=...) when
+    param_grid only holds '<last step>__' parameters."""
+
+    def __init__(self, pipeline: Pipeline, param_grid: dict, cv=5, scoring="accuracy", n_jobs=-1):
+        self.pipeline = pipeline
+        self.param_grid = param_grid
+        self.cv = cv
+        self.scoring = scoring
+        self.n_jobs = n_jobs
+
+    def fit(self, x, y):
+        step_name, classifier = self.pipeline.steps[-1]
+        featurizer = Pipeline(self.pipeline.steps[:-1])
+        prefix = f"{step_name}__"
+        candidates = list(ParameterGrid(self.param_grid))
+        for name in self.param_grid:
+            if not name.startswith(prefix):
+                raise ValueError(
+                    f"'{name}' is not a parameter of the '{step_name}' step; "
+                    "use GridSearchCV to tune the featurization steps."
+                )
+        x, y = np.asarray(x, dtype=object), np.asarray(y)
+        scorer = get_scorer(self.scoring)
+        folds = list(StratifiedKFold(n_splits=self.cv).split(x, y))
+
+        with Parallel(n_jobs=self.n_jobs) as parallel:
+            fold_data = parallel(
+                delayed(_featurize_fold)(featurizer, x, y, train_idx, val_idx)
+                for train_idx, val_idx in folds
+            )
+            scores = parallel(
+                delayed(_score_candidate)(
+                    classifier,
+                    {name[len(prefix):]: value for name, value in params.items()},
+                    fold,
+                    scorer,
+                )
+                for params in candidates
+                for fold in fold_data
+            )
+
+        scores = np.array(scores).reshape(len(candidates), len(folds), 2)
+        self.cv_results_ = pd.DataFrame(candidates)
+        self.cv_results_["params"] = candidates
+        for f in range(len(folds)):
+            self.cv_results_[f"split{f}_test_score"] = scores[:, f, 0]
+        self.cv_results_["mean_test_score"] = scores[:, :, 0].mean(axis=1)
+        self.cv_results_["std_test_score"] = scores[:, :, 0].std(axis=1)
+        self.cv_results_["mean_fit_time"] = scores[:, :, 1].mean(axis=1)
+        self.cv_results_["rank_test_score"] = (
+            self.cv_results_["mean_test_score"].rank(ascending=False, method="min").astype(int)
+        )
+
+        best = int(np.argmax(self.cv_results_["mean_test_score"]))
+        self.best_index_ = best
+        self.best_params_ = candidates[best]
+        self.best_score_ = self.cv_results_["mean_test_score"][best]
+        self.best_estimator_ = clone(self.pipeline).set_params(**self.best_params_)
+        self.best_estimator_.fit(x, y)
+        return self
+
+    def predict(self, x):
+        return self.best_estimator_.predict(x)
@@ -0,0 +1,154 @@
+import argparse
+import csv
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dict_analysis import read_dictionary
+from embedding_similarity import unit_rows, word_rows
+from glove_store import load_glove
+
+
+# Expanding many dictionaries (constructs) at once. Each construct's centroid is
+# the mean vector of its seed words; with every centroid in one matrix, the
+# deductive search over the whole embedding vocabulary and the inductive search
+# over a corpus vocabulary are each a single batched matrix product.
+def seed_sets_from_dictionaries(paths) -> dict:
+    """{variable name: word list} from CAT Scanner .dict files or folders of them.
+    Wildcards are dropped from the end of words ('abandon*' -> 'abandon')."""
+    seed_sets = {}
+    for path in paths:
+        path = Path(path)
+        for file in sorted(path.glob("*.dict")) if path.is_dir() else [path]:
+            dictionary = read_dictionary(file)
+            seed_sets[dictionary["var_name"]] = [word.rstrip("*") for word in dictionary["words"]]
+    return seed_sets
+
+
+def seed_sets_from_csv(path) -> dict:
+    """{construct: word list} from a CSV with 'construct' and 'word' columns."""
+    seeds = pd.read_csv(path, dtype=str).dropna(subset=["construct", "word"])
+    return {name: group["word"].str.strip().str.lower().tolist() for name, group in seeds.groupby("construct", sort=False)}
+
+
+def corpus_vocabulary(path) -> list:
+    """Unique lowercased, whitespace-split words in a .txt file or a folder of .txt files."""
+    path = Path(path)
+    words = set()
+    for file in sorted(path.rglob("*.txt")) if path.is_dir() else [path]:
+        words.update(file.read_text(encoding="utf-8").lower().split())
+    return sorted(words)
+
+
+def centroid_matrix(store, seed_sets: dict) -> tuple:
+    """(construct names, unit-length centroids) for the seed sets with at least one word in 'store'."""
+    names, centroids = [], []
+    for name, words in seed_sets.items():
+        known = [word for word in words if word in store]
+        if not known:
+            print(f"Skipping '{name}': none of its words have embeddings.")
+            continue
+        names.append(name)
+        centroids.append(np.mean([store[word] for word in known], axis=0))
+    return names, unit_rows(np.array(centroids))
+
+
+def _merge_top_k(best_ids, best_scores, ids, scores, k):
+    # Keeps the k best of the running results and a new block, per construct (row)
+    all_ids = np.concatenate([best_ids, np.broadcast_to(ids, scores.shape)], axis=1)
+    all_scores = np.concatenate([best_scores, scores], axis=1)
+    keep = np.argpartition(-all_scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(all_ids, keep, axis=1), np.take_along_axis(all_scores, keep, axis=1)
+
+
+def batched_top_k(matrix, centroids, k=50, chunk_size=50_000) -> tuple:
+    """(ids, scores) of the k rows of 'matrix' (unit vectors) closest to each centroid,
+    best first; 'matrix' is read in chunks so a memory-mapped store stays on disk."""
+    k = min(k, matrix.shape[0])
+    best_ids = np.zeros((len(centroids), 0), dtype=np.int64)
+    best_scores = np.zeros((len(centroids), 0), dtype=np.float32)
+    for start in range(0, matrix.shape[0], chunk_size):
+        block = np.asarray(matrix[start : start + chunk_size])
+        scores = centroids @ block.T
+        ids = np.arange(start, start + len(block))[None, :]
+        best_ids, best_scores = _merge_top_k(best_ids, best_scores, ids, scores, k)
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    return np.take_along_axis(best_ids, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+
+def expand_constructs(store, seed_sets: dict, corpus_words=None, k=50) -> dict:
+    """{construct: candidate table} with the k deductive (whole embedding vocabulary) and,
+    given corpus_words, k inductive (corpus vocabulary) candidates closest to each centroid."""
+    names, centroids = centroid_matrix(store, seed_sets)
+    if not names:
+        return {}
+    ids, scores = batched_top_k(store.normalized, centroids, k)
+    deductive = [
+        {store.index_to_key[i]: float(s) for i, s in zip(row_ids, row_scores)}
+        for row_ids, row_scores in zip(ids, scores)
+    ]
+    inductive = [{} for _ in names]
+    if corpus_words is not None:
+        corpus_words = [word for word in corpus_words if word in store]
+        if corpus_words:
+            ids, scores = batched_top_k(word_rows(store, corpus_words), centroids, k)
+            inductive = [
+                {corpus_words[i]: float(s) for i, s in zip(row_ids, row_scores)}
+                for row_ids, row_scores in zip(ids, scores)
+            ]
+
+    results = {}
+    for name, found_deductive, found_inductive in zip(names, deductive, inductive):
+        seeds = set(seed_sets[name])
+        rows = [
+            {
+                "word": word,
+                "score": score,
+                "source": "both" if word in found_deductive and word in found_inductive
+                else "deductive" if word in found_deductive else "inductive",
+                "seed": word in seeds,
+            }
+            for word, score in {**found_deductive, **found_inductive}.items()
+        ]
+        results[name] = pd.DataFrame(rows).sort_values("score", ascending=False, ignore_index=True)
+    return results
+
+
+def write_evaluation_csvs(results: dict, directory) -> list:
+    """One <construct>.csv per construct, with an empty 'eval' column to fill in by hand."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, table in results.items():
+        path = directory / f"{name}.csv"
+        table.assign(eval="").to_csv(path, index=False, encoding="utf-8", quoting=csv.QUOTE_MINIMAL)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Expand many dictionaries with word embeddings in one run.")
+    parser.add_argument("glove", help="A GloVe .txt file (converted to a binary store on first use)")
+    parser.add_argument("output", help="Folder for the per-construct evaluation CSVs")
+    parser.add_argument("--dicts", nargs="*", default=[], help="CAT Scanner .dict files or folders of them")
+    parser.add_argument("--seeds", help="A CSV of seed words with 'construct' and 'word' columns")
+    parser.add_argument("--corpus", help="A .txt file or folder of .txt files for inductive candidates")
+    parser.add_argument("--k", type=int, default=50, help="Candidates per construct from each search")
+    args = parser.parse_args()
+
+    seed_sets = seed_sets_from_dictionaries(args.dicts)
+    if args.seeds:
+        seed_sets.update(seed_sets_from_csv(args.seeds))
+    if not seed_sets:
+        parser.error("Pass seed words with --dicts and/or --seeds.")
+    store = load_glove(args.glove)
+    corpus_words = corpus_vocabulary(args.corpus) if args.corpus else None
+    print(f"Expanding {len(seed_sets)} constructs...", flush=True)
+    results = expand_constructs(store, seed_sets, corpus_words, args.k)
+    paths = write_evaluation_csvs(results, args.output)
+    print(f"Saved {len(paths)} evaluation CSVs to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+
+from embedding_similarity import top_k, unit_rows
+
+
+class IVFIndex:
+    """Approximate nearest neighbours over a GloveStore (inverted file index).
+
+    The unit-length vectors are clustered with k-means into n_lists lists. A
+    query is compared with the list centroids and only the vectors in its
+    n_probe closest lists are scored exactly, so each query touches a small
+    fraction of the vocabulary. The index is saved in the store's folder.
+    """
+
+    def __init__(self, store, centroids, order, offsets):
+        self.store = store
+        self.centroids = centroids
+        self.order = order
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, store, n_lists=None, sample_size=100_000, seed=24601) -> "IVFIndex":
+        start = time.perf_counter()
+        n_words = len(store)
+        n_lists = n_lists or max(1, int(np.sqrt(n_words)))
+        print(f"Building an index with {n_lists:,} lists over {n_words:,} vectors...", flush=True)
+        rng = np.random.default_rng(seed)
+        sample = np.sort(rng.choice(n_words, size=min(sample_size, n_words), replace=False))
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, batch_size=4096, n_init=1, random_state=seed)
+        kmeans.fit(np.asarray(store.normalized[sample]))
+        centroids = unit_rows(kmeans.cluster_centers_)
+        # Every vector joins the list whose centroid it is most similar to
+        lists = np.empty(n_words, dtype=np.int32)
+        for chunk in range(0, n_words, 50_000):
+            lists[chunk : chunk + 50_000] = np.argmax(
+                np.asarray(store.normalized[chunk : chunk + 50_000]) @ centroids.T, axis=1
+            )
+        order = np.argsort(lists, kind="stable").astype(np.int32)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(lists, minlength=n_lists))]).astype(np.int64)
+        print(f"Index built in {time.perf_counter() - start:,.0f}s")
+        return cls(store, centroids, order, offsets)
+
+    def save(self, directory):
+        directory = Path(directory)
+        np.save(directory / "ivf_centroids.npy", self.centroids)
+        np.save(directory / "ivf_order.npy", self.order)
+        np.save(directory / "ivf_offsets.npy", self.offsets)
+
+    @classmethod
+    def load(cls, store, directory) -> "IVFIndex":
+        directory = Path(directory)
+        return cls(
+            store,
+            np.load(directory / "ivf_centroids.npy"),
+            np.load(directory / "ivf_order.npy", mmap_mode="r"),
+            np.load(directory / "ivf_offsets.npy"),
+        )
+
+    def search_ids(self, vector, topn=10, n_probe=32) -> tuple:
+        """(word ids, cosine similarities) of the approximate topn neighbours, closest first."""
+        query = unit_rows(vector)[0]
+        lists = top_k(self.centroids @ query, n_probe)
+        ids = np.sort(np.concatenate([self.order[self.offsets[i] : self.offsets[i + 1]] for i in lists]))
+        similarities = np.asarray(self.store.normalized[ids]) @ query
+        best = top_k(similarities, topn)
+        return ids[best], similarities[best]
+
+    def similar_by_vector(self, vector, topn=10, n_probe=32) -> list:
+        ids, similarities = self.search_ids(vector, topn, n_probe)
+        return [(self.store.index_to_key[i], float(s)) for i, s in zip(ids, similarities)]
+
+    def recall(self, queries, topn=50, n_probe=32) -> float:
+        """Share of the exact topn neighbours that the index also returns, averaged over queries."""
+        found = []
+        for query in np.atleast_2d(queries):
+            exact = {word for word, _ in self.store.similar_by_vector(query, topn)}
+            approximate = {word for word, _ in self.similar_by_vector(query, topn, n_probe)}
+            found.append(len(exact & approximate) / topn)
+        return float(np.mean(found))
+
+
+def load_index(store, n_lists=None, n_checks=100, seed=24601) -> IVFIndex:
+    """Loads the index saved in the GloveStore's folder, building it the first time
+    (or again if the saved index no longer matches the store's size or dimension).
+    A new index reports its recall against exact search on n_checks random words."""
+    if (store.directory / "ivf_centroids.npy").exists():
+        index = IVFIndex.load(store, store.directory)
+        if len(index.order) == len(store) and index.centroids.shape[1] == store.vector_size:
+            return index
+        print("The saved index doesn't match the store; rebuilding it.")
+    index = IVFIndex.build(store, n_lists, seed=seed)
+    index.save(store.directory)
+    checks = np.random.default_rng(seed).choice(len(store), size=min(n_checks, len(store)), replace=False)
+    recall = index.recall(np.asarray(store.normalized[np.sort(checks)]))
+    print(f"Recall@50 against exact search on {len(checks)} random words: {recall:.3f}")
+    return index
@@ -0,0 +1,66 @@
+import time
+
+import matplotlib.pyplot as plt
+import numpy as np
+from sklearn.decomposition import PCA
+from sklearn.manifold import TSNE
+from sklearn.random_projection import GaussianRandomProjection
+
+
+# 2-D maps of word vectors. t-SNE starts from the PCA layout and keeps
+# optimising only while it still makes progress; PCA and random projection
+# are near-instant alternatives for word lists too long for t-SNE.
+PROJECTION_METHODS = ("tsne", "pca", "random")
+
+
+def tsne_2d(vectors, perplexity=5, max_iter=10000, chunk=500, tolerance=0.01, seed=24601) -> np.ndarray:
+    """PCA-initialised t-SNE. After the first 1,000 iterations it continues in
+    chunks of 'chunk' iterations (no exaggeration, same learning rate) and stops
+    once a chunk lowers the KL divergence by less than 'tolerance' (relative)."""
+    perplexity = min(perplexity, len(vectors) - 1)
+    tsne = TSNE(n_components=2, perplexity=perplexity, init="pca", max_iter=min(1000, max_iter), random_state=seed)
+    points = tsne.fit_transform(vectors)
+    iterations, kl_divergence = tsne.n_iter_ + 1, tsne.kl_divergence_
+    while iterations + chunk <= max_iter:
+        tsne = TSNE(
+            n_components=2,
+            perplexity=perplexity,
+            init=points,
+            early_exaggeration=1.0,
+            learning_rate=tsne.learning_rate_,
+            max_iter=chunk,
+            random_state=seed,
+        )
+        points = tsne.fit_transform(vectors)
+        iterations += tsne.n_iter_ + 1
+        improvement = (kl_divergence - tsne.kl_divergence_) / kl_divergence
+        kl_divergence = tsne.kl_divergence_
+        if improvement < tolerance:
+            break
+    print(f"t-SNE stopped after {iterations:,} iterations (KL divergence {kl_divergence:.3f})")
+    return points
+
+
+def project_2d(vectors, method="tsne", seed=24601, **tsne_options) -> np.ndarray:
+    """(n, 2) coordinates for word vectors with 'tsne', 'pca' or 'random' (Gaussian random projection)."""
+    start = time.perf_counter()
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if method == "tsne":
+        points = tsne_2d(vectors, seed=seed, **tsne_options)
+    elif method == "pca":
+        points = PCA(n_components=2, random_state=seed).fit_transform(vectors)
+    elif method == "random":
+        points = GaussianRandomProjection(n_components=2, random_state=seed).fit_transform(vectors)
+    else:
+        raise ValueError(f"Unknown projection method '{method}'. Choose from {', '.join(PROJECTION_METHODS)}.")
+    print(f"Projected {len(vectors):,} words with {method} in {time.perf_counter() - start:,.1f}s")
+    return points
+
+
+def plot_words(words: list, points, figsize=(12, 8), color="blue", size=30):
+    """Scatter plot of projected words (one scatter call) with each point labelled."""
+    fig, ax = plt.subplots(figsize=figsize)
+    ax.scatter(points[:, 0], points[:, 1], c=color, s=size)
+    for word, (x, y) in zip(words, points):
+        ax.annotate(word, xy=(x, y), xytext=(5, 2), textcoords="offset points")
+    return fig
@@ -0,0 +1,45 @@
+import numpy as np
+
+
+# Cosine similarities for dictionary expansion as matrix products. Vectors are
+# L2-normalised once, so every similarity below is a dot product and each
+# question (all pairs, leave-one-out fit, candidates vs. a centroid) is one
+# matrix multiplication.
+def unit_rows(vectors) -> np.ndarray:
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1)
+
+
+def word_rows(store, words: list) -> np.ndarray:
+    """Unit-length vectors for 'words' from a GloveStore (rows in the order given)."""
+    return np.asarray(store.normalized[[store.key_to_index[word] for word in words]])
+
+
+def pairwise_similarities(store, words: list) -> np.ndarray:
+    """(n, n) cosine similarities between every pair of words."""
+    rows = word_rows(store, words)
+    return rows @ rows.T
+
+
+def leave_one_out(similarities: np.ndarray) -> np.ndarray:
+    """Each word's mean similarity to the other words, from a pairwise matrix."""
+    n = similarities.shape[0]
+    return (similarities.sum(axis=1) - np.diag(similarities)) / (n - 1)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest scores, highest first."""
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def rank_candidates(store, candidates: list, vector, k=50) -> list:
+    """The k candidate words most similar to 'vector', as (word, similarity) pairs.
+    Candidates missing from the store are skipped."""
+    candidates = [word for word in candidates if word in store]
+    if not candidates:
+        return []
+    similarities = word_rows(store, candidates) @ unit_rows(vector)[0]
+    return [(candidates[i], float(similarities[i])) for i in top_k(similarities, k)]
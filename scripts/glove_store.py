@@ -0,0 +1,128 @@
+import csv
+import hashlib
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# A binary copy of a GloVe text file: vocab.txt (one word per line), vectors.npy
+# (float32) and normalized.npy (the same rows scaled to unit length). The .npy
+# files are memory-mapped, so loading is near-instant and processes reading the
+# same store share its pages instead of each parsing the text file.
+def store_path(glove_file) -> Path:
+    """Where the binary store for a GloVe text file lives: a folder beside it, e.g. glove.6B.100d/."""
+    glove_file = Path(glove_file)
+    return glove_file.with_suffix("")
+
+
+def convert_glove(glove_file, store_dir=None) -> Path:
+    """One-time conversion of a GloVe .txt file to a binary store."""
+    store_dir = Path(store_dir) if store_dir is not None else store_path(glove_file)
+    start = time.perf_counter()
+    print(f"Converting {glove_file} to a binary store in {store_dir}...", flush=True)
+    table = pd.read_csv(
+        glove_file,
+        sep=" ",
+        header=None,
+        index_col=0,
+        quoting=csv.QUOTE_NONE,
+        keep_default_na=False,
+        na_filter=False,
+        encoding="utf-8",
+    )
+    vectors = table.to_numpy(dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    np.save(store_dir / "vectors.npy", vectors)
+    np.save(store_dir / "normalized.npy", vectors / np.where(norms > 0, norms, 1))
+    with open(store_dir / "vocab.txt", "w", encoding="utf-8") as outfile:
+        outfile.write("\n".join(table.index.astype(str)))
+    print(f"Stored {len(table):,} vectors in {time.perf_counter() - start:,.0f}s")
+    return store_dir
+
+
+class GloveStore:
+    """Word vectors from a binary store, with the lookups the assignments use from gensim's KeyedVectors."""
+
+    def __init__(self, store_dir):
+        self.directory = Path(store_dir)
+        with open(self.directory / "vocab.txt", "r", encoding="utf-8") as infile:
+            self.index_to_key = infile.read().split("\n")
+        self.key_to_index = {word: idx for idx, word in enumerate(self.index_to_key)}
+        self.vectors = np.load(self.directory / "vectors.npy", mmap_mode="r")
+        self.normalized = np.load(self.directory / "normalized.npy", mmap_mode="r")
+        self.vector_size = self.vectors.shape[1]
+
+    def __len__(self):
+        return len(self.index_to_key)
+
+    def __contains__(self, word):
+        return word in self.key_to_index
+
+    def __getitem__(self, word) -> np.ndarray:
+        return np.asarray(self.vectors[self.key_to_index[word]])
+
+    def similar_by_vector(self, vector, topn=10) -> list:
+        """The topn (word, cosine similarity) pairs closest to 'vector'."""
+        vector = np.asarray(vector, dtype=np.float32)
+        similarities = self.normalized @ (vector / np.linalg.norm(vector))
+        top = np.argpartition(-similarities, topn)[:topn]
+        top = top[np.argsort(-similarities[top])]
+        return [(self.index_to_key[i], float(similarities[i])) for i in top]
+
+    def similar_by_word(self, word, topn=10) -> list:
+        """Like similar_by_vector, leaving out the word itself."""
+        similar = self.similar_by_vector(self[word], topn + 1)
+        return [(other, score) for other, score in similar if other != word][:topn]
+
+    def keyed_vectors(self):
+        """A gensim KeyedVectors over the memory-mapped vectors (for most_similar, similarity, ...)."""
+        from gensim.models import KeyedVectors
+
+        kv = KeyedVectors(self.vector_size, count=0, dtype=np.float32)
+        kv.index_to_key = self.index_to_key
+        kv.key_to_index = self.key_to_index
+        kv.vectors = self.vectors
+        kv.norms = None
+        return kv
+
+
+def load_glove(glove_file) -> GloveStore:
+    """Loads the binary store for a GloVe .txt file, converting it the first time."""
+    store_dir = store_path(glove_file)
+    if not (store_dir / "normalized.npy").exists():
+        convert_glove(glove_file, store_dir)
+    return GloveStore(store_dir)
+
+
+# Corpus-restricted subsets: a store holding only the words a corpus (plus any
+# seed words) needs, saved beside the corpus. Once built, loading it never
+# touches the full store, so memory and load time follow the corpus vocabulary.
+def subset_path(corpus_path, glove_file, words) -> Path:
+    """e.g. article_preprint.glove.6B.100d.<hash>/ beside article_preprint.txt"""
+    corpus_path, words = Path(corpus_path), sorted(set(words))
+    digest = hashlib.sha1("\n".join(words).encode("utf-8")).hexdigest()[:8]
+    return corpus_path.parent / f"{corpus_path.stem}.{Path(glove_file).stem}.{digest}"
+
+
+def build_subset(store, words, store_dir) -> Path:
+    """Writes the vectors of the 'words' found in 'store' as a store of their own."""
+    store_dir = Path(store_dir)
+    ids = sorted({store.key_to_index[word] for word in words if word in store})
+    store_dir.mkdir(parents=True, exist_ok=True)
+    np.save(store_dir / "vectors.npy", np.asarray(store.vectors[ids]))
+    np.save(store_dir / "normalized.npy", np.asarray(store.normalized[ids]))
+    with open(store_dir / "vocab.txt", "w", encoding="utf-8") as outfile:
+        outfile.write("\n".join(store.index_to_key[i] for i in ids))
+    return store_dir
+
+
+def load_subset(glove_file, words, corpus_path) -> GloveStore:
+    """The embeddings of 'words' (a corpus vocabulary plus seed words), stored beside
+    corpus_path and built from the full GloVe store the first time."""
+    store_dir = subset_path(corpus_path, glove_file, words)
+    if not (store_dir / "normalized.npy").exists():
+        build_subset(load_glove(glove_file), words, store_dir)
+    return GloveStore(store_dir)
@@ -0,0 +1,104 @@
+from pathlib import Path
+
+import joblib
+import numpy as np
+from scipy import sparse
+
+from lda_registry import corpus_hash
+
+# u_mass is tomotopy's preset; the _doc measures are document-level versions of
+# tomotopy's sliding-window c_uci, c_npmi and c_v and give different values
+COHERENCE_MEASURES = ("u_mass", "c_uci_doc", "c_npmi_doc", "c_v_doc")
+
+
+class CooccurrenceIndex:
+    """Word and word-pair document frequencies over a reference corpus.
+
+    The corpus is read once into a sparse document x word incidence matrix;
+    scoring a topic then only slices the columns of its top words. Every
+    measure uses document co-occurrence (a word pair co-occurs if both words
+    appear in the same document), so u_mass matches tomotopy's preset while
+    c_uci_doc, c_npmi_doc and c_v_doc are document-level versions of
+    tomotopy's sliding-window c_uci, c_npmi and c_v, named apart because their
+    values differ.
+    """
+
+    measures = COHERENCE_MEASURES
+
+    def __init__(self, docs):
+        self.vocabulary_ = {}
+        indices, indptr = [], [0]
+        for doc in docs:
+            if not doc:
+                # Empty documents aren't part of a tomotopy model's corpus either
+                continue
+            indices.extend({self.vocabulary_.setdefault(word, len(self.vocabulary_)) for word in doc})
+            indptr.append(len(indices))
+        self.n_docs_ = len(indptr) - 1
+        self.incidence_ = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int32), np.array(indices, dtype=np.int32), indptr),
+            shape=(self.n_docs_, len(self.vocabulary_)),
+        ).tocsc()
+        self.df_ = np.diff(self.incidence_.indptr)
+
+    def counts(self, words: list) -> tuple:
+        """(document frequency of each word, document frequency of each word pair)."""
+        ids = np.array([self.vocabulary_.get(word, -1) for word in words])
+        # Words missing from the reference corpus get an all-zero column
+        columns = self.incidence_[:, np.maximum(ids, 0)].multiply((ids >= 0).astype(np.int32)).tocsc()
+        pairs = (columns.T @ columns).toarray()
+        return np.diag(pairs).copy(), pairs
+
+    def score_topic(self, words: list, measure="u_mass", eps=1e-12) -> float:
+        """Coherence of one topic's top words, most probable first."""
+        df, pairs = self.counts(words)
+        p_word, p_pair = df / self.n_docs_, pairs / self.n_docs_
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if measure == "u_mass":
+                # Each word against every more probable word
+                lower = np.tril_indices(len(words), k=-1)
+                return float(np.mean(np.log((p_pair[lower] + eps) / p_word[lower[1]])))
+            pmi = np.log((p_pair + eps) / np.outer(p_word, p_word))
+            npmi = pmi / -np.log(p_pair + eps)
+            upper = np.triu_indices(len(words), k=1)
+            if measure == "c_uci_doc":
+                return float(np.mean(pmi[upper]))
+            if measure == "c_npmi_doc":
+                return float(np.mean(npmi[upper]))
+            if measure == "c_v_doc":
+                # Cosine between each word's NPMI context vector and the whole topic's
+                topic_vector = npmi.sum(axis=0)
+                cosines = npmi @ topic_vector / (np.linalg.norm(npmi, axis=1) * np.linalg.norm(topic_vector))
+                return float(np.mean(cosines))
+        raise ValueError(f"Unknown coherence measure '{measure}'. Use one of {COHERENCE_MEASURES}.")
+
+    def score_model(self, mdl, measure="u_mass", top_n=10) -> tuple:
+        """(average coherence, coherence per topic) for a trained tomotopy model."""
+        per_topic = [
+            self.score_topic([word for word, _ in mdl.get_topic_words(k, top_n=top_n)], measure)
+            for k in range(mdl.k)
+        ]
+        return float(np.mean(per_topic)), per_topic
+
+    def save(self, path):
+        joblib.dump(self, Path(path))
+
+    @staticmethod
+    def load(path) -> "CooccurrenceIndex":
+        return joblib.load(Path(path))
+
+
+def build_index(docs, directory=None) -> CooccurrenceIndex:
+    """Builds the index over the tokenized docs; with a directory, it is saved there
+    under the documents' hash and loaded instead of rebuilt the next time."""
+    docs = [list(doc) for doc in docs]
+    path = None
+    if directory is not None:
+        path = Path(directory) / f"cooccurrence_{corpus_hash(docs)}.joblib"
+        if path.exists():
+            return CooccurrenceIndex.load(path)
+    index = CooccurrenceIndex(docs)
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        index.save(path)
+    return index
@@ -0,0 +1,101 @@
+import argparse
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import tomotopy as tp
+from joblib import Parallel, delayed
+from nltk.corpus import stopwords
+from nltk.tokenize import word_tokenize
+
+from lda_registry import load_model
+from ml_bundle import read_texts
+
+
+# Scoring new documents against a trained topic model: texts are preprocessed in
+# parallel, then inferred in batches with tomotopy's own worker threads.
+def preprocess(text: str) -> list:
+    """Same cleaning as the topic model assignments: letters only, lowercased, no stopwords."""
+    stop_words = set(stopwords.words("english"))
+    text = re.sub(r"[^A-Za-z]", " ", text)
+    return [word for word in word_tokenize(text.lower()) if word not in stop_words and word.isalpha()]
+
+
+def _preprocess_chunk(texts: list) -> list:
+    return [preprocess(text) for text in texts]
+
+
+def preprocess_texts(texts: list, n_jobs=-1, chunk_size=500) -> list:
+    """preprocess() over many texts, split into chunks across processes."""
+    chunks = Parallel(n_jobs=n_jobs)(
+        delayed(_preprocess_chunk)(texts[i : i + chunk_size]) for i in range(0, len(texts), chunk_size)
+    )
+    return [doc for chunk in chunks for doc in chunk]
+
+
+def load_topic_model(path):
+    """A saved .bin model, or the best model in a registry folder (see lda_registry)."""
+    path = Path(path)
+    if path.is_dir():
+        return load_model(path)[0]
+    return tp.LDAModel.load(str(path))
+
+
+def infer_topics(mdl, docs: list, workers=0, iterations=100, batch_size=5000) -> np.ndarray:
+    """(n_docs, k) topic distributions for tokenized docs. Empty docs get a row of NaN."""
+    topics = np.full((len(docs), mdl.k), np.nan, dtype=np.float32)
+    # tomotopy rejects documents without words, so those are left out
+    rows = [i for i, doc in enumerate(docs) if doc]
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start : start + batch_size]
+        distributions, _ = mdl.infer([mdl.make_doc(docs[i]) for i in batch], iterations, workers=workers)
+        topics[batch] = np.stack(distributions)
+    return topics
+
+
+def infer_file(
+    model_path, input_path, output_path, text_column="text", workers=0, n_jobs=-1, batch_size=5000
+) -> pd.DataFrame:
+    """Writes the document-topic matrix for a .csv, .txt or folder of .txt files.
+    A .npy output holds the bare matrix; anything else is written as a .csv
+    with the input's other columns and one topic_<k> column per topic."""
+    mdl = load_topic_model(model_path)
+    data = read_texts(input_path, text_column)
+    print(f"Preprocessing {len(data):,} documents...", flush=True)
+    docs = preprocess_texts(data[text_column].tolist(), n_jobs=n_jobs)
+    print(f"Inferring topics with {mdl.k} topics...", flush=True)
+    topics = infer_topics(mdl, docs, workers=workers, batch_size=batch_size)
+    output_path = Path(output_path)
+    results = pd.concat(
+        [
+            data.drop(columns=text_column).reset_index(drop=True),
+            pd.DataFrame(topics, columns=[f"topic_{k}" for k in range(mdl.k)]),
+        ],
+        axis=1,
+    )
+    if output_path.suffix == ".npy":
+        np.save(output_path, topics)
+    else:
+        results.to_csv(output_path, index=False, encoding="utf-8")
+    print(f"Saved topic distributions for {len(results):,} documents to {output_path}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Infer topic distributions for new documents.")
+    parser.add_argument("model", help="A saved .bin model or a registry folder")
+    parser.add_argument("input", help="A .csv, a .txt with one document per line, or a folder of .txt files")
+    parser.add_argument("output", help="A .csv, or a .npy for the bare document-topic matrix")
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--workers", type=int, default=0, help="tomotopy threads (0 = all cores)")
+    parser.add_argument("--jobs", type=int, default=-1, help="preprocessing processes (-1 = all cores)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    infer_file(
+        args.model, args.input, args.output, args.text_column, args.workers, args.jobs, args.batch_size
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import tomotopy as tp
+
+REGISTRY_FILE = "registry.json"
+
+
+# A topic model registry is a folder of saved tomotopy models plus a registry.json
+# describing each one (hyperparameters, coherence, corpus hash), so reports and
+# inference can reuse trained models instead of retraining them.
+def _plain(params: dict) -> dict:
+    # Hyperparameters as JSON values (TermWeight members are stored as their ints)
+    return json.loads(json.dumps(params, sort_keys=True, default=str))
+
+
+def _read(directory) -> list:
+    path = Path(directory) / REGISTRY_FILE
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as infile:
+        return json.load(infile)
+
+
+def _write(directory, entries: list):
+    with open(Path(directory) / REGISTRY_FILE, "w", encoding="utf-8") as outfile:
+        json.dump(entries, outfile, indent=2)
+
+
+def corpus_hash(docs) -> str:
+    """Fingerprint of the tokenized documents, used to name cached corpora and indexes
+    and to match registered models to the corpus they were trained on."""
+    digest = hashlib.sha1()
+    for doc in docs:
+        digest.update("\x1f".join(doc).encode("utf-8"))
+        digest.update(b"\x1e")
+    return digest.hexdigest()[:16]
+
+
+def model_name(params: dict, corpus_hash: str) -> str:
+    """The same hyperparameters on the same corpus always get the same name."""
+    key = json.dumps([_plain(params), corpus_hash], sort_keys=True)
+    return "lda_" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+def register_model(directory, mdl, params: dict, coherence: float, corpus_hash: str, **metadata) -> dict:
+    """Saves 'mdl' (with its training state, so it can be resumed) and records it.
+    A model already registered under the same hyperparameters and corpus is replaced."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    name = model_name(params, corpus_hash)
+    mdl.save(str(directory / f"{name}.bin"), full=True)
+    entry = {
+        "name": name,
+        "file": f"{name}.bin",
+        "params": _plain(params),
+        "coherence": float(coherence),
+        "corpus_hash": corpus_hash,
+        "iterations": mdl.global_step,
+        "ll_per_word": mdl.ll_per_word,
+        "saved": datetime.now().isoformat(timespec="seconds"),
+        "metadata": metadata,
+    }
+    entries = [e for e in _read(directory) if e["name"] != name]
+    _write(directory, entries + [entry])
+    return entry
+
+
+def list_models(directory, corpus_hash=None) -> pd.DataFrame:
+    """One row per registered model, best coherence first."""
+    entries = [e for e in _read(directory) if corpus_hash is None or e["corpus_hash"] == corpus_hash]
+    if not entries:
+        return pd.DataFrame()
+    table = pd.DataFrame(
+        [{**e["params"], **{k: v for k, v in e.items() if k not in ("params", "metadata")}} for e in entries]
+    )
+    return table.sort_values("coherence", ascending=False, ignore_index=True)
+
+
+def find_model(directory, params: dict, corpus_hash: str):
+    """The registry entry for these hyperparameters on this corpus, or None."""
+    name = model_name(params, corpus_hash)
+    return next((e for e in _read(directory) if e["name"] == name), None)
+
+
+def load_model(directory, name=None) -> tuple:
+    """(model, entry) for a registered model; the best-scoring one if no name is given."""
+    entries = _read(directory)
+    if not entries:
+        raise FileNotFoundError(f"No topic models are registered in {directory}.")
+    if name is None:
+        entry = max(entries, key=lambda e: e["coherence"])
+    else:
+        entry = next((e for e in entries if e["name"] == name), None)
+        if entry is None:
+            raise KeyError(f"No topic model named '{name}' in {directory}.")
+    return tp.LDAModel.load(str(Path(directory) / entry["file"])), entry
+
+
+def resume_model(directory, name, iterations: int, workers=0, coherence="u_mass", index=None) -> tuple:
+    """Trains a registered model for more iterations and updates its entry.
+    Coherence is rescored from 'index' (a CooccurrenceIndex) when given and it
+    provides the measure (u_mass or a document-level _doc measure)."""
+    mdl, entry = load_model(directory, name)
+    mdl.train(iterations, workers=workers)
+    if index is not None and coherence in index.measures:
+        score = index.score_model(mdl, coherence)[0]
+    else:
+        score = tp.coherence.Coherence(mdl, coherence=coherence).get_score()
+    entry = register_model(directory, mdl, entry["params"], score, entry["corpus_hash"], **entry["metadata"])
+    return mdl, entry
@@ -0,0 +1,216 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import tomotopy as tp
+
+from lda_coherence import CooccurrenceIndex
+from lda_registry import corpus_hash, find_model, load_model, register_model
+
+# Corpus and co-occurrence index for the sweep, sent to each worker process once
+_corpus, _index = None, None
+
+
+def _init_worker(corpus, index):
+    global _corpus, _index
+    _corpus, _index = corpus, index
+
+
+def build_corpus(docs, directory=None) -> tp.utils.Corpus:
+    """Indexes the tokenized docs once so every model can be built from them.
+
+    With a directory, the corpus is saved there under the documents' hash and
+    loaded instead of rebuilt the next time the same documents are passed.
+    """
+    docs = [list(doc) for doc in docs]
+    path = None
+    if directory is not None:
+        path = Path(directory) / f"corpus_{corpus_hash(docs)}.cps"
+        if path.exists():
+            return tp.utils.Corpus.load(str(path))
+    corpus = tp.utils.Corpus()
+    for doc in docs:
+        # Empty documents are skipped by the corpus
+        corpus.add_doc(doc)
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        corpus.save(str(path))
+    return corpus
+
+
+def available_cores() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def plan_workers(n_models: int, cores=None) -> tuple:
+    """(processes, tomotopy workers per model) that fill the cores without oversubscribing them."""
+    cores = cores or available_cores()
+    processes = max(1, min(n_models, cores))
+    return processes, max(1, cores // processes)
+
+
+def score_coherence(mdl, coherence="u_mass", index=None) -> float:
+    """Average topic coherence. u_mass and the document-level _doc measures come from
+    a CooccurrenceIndex when given (see lda_coherence); tomotopy's sliding-window
+    c_uci, c_npmi and c_v are always computed by tomotopy."""
+    if index is not None and coherence in index.measures:
+        return index.score_model(mdl, coherence)[0]
+    if coherence.endswith("_doc"):
+        raise ValueError(f"The '{coherence}' coherence measure needs a CooccurrenceIndex.")
+    return tp.coherence.Coherence(mdl, coherence=coherence).get_score()
+
+
+def train_to_convergence(
+    mdl, max_iterations=1000, chunk=50, tolerance=1e-3, patience=2, workers=0, coherence=None, index=None
+) -> pd.DataFrame:
+    """Trains 'mdl' in chunks until the per-word log-likelihood stops improving.
+
+    Training stops once 'patience' chunks in a row fail to beat the best
+    log-likelihood so far by more than 'tolerance' (relative), or after
+    max_iterations; chunks that end within the model's burn_in don't count
+    towards 'patience'. Returns the training curve, one row per chunk; pass a
+    coherence measure (e.g. "u_mass") to also score the topics after each chunk.
+    """
+    rows, best, stale = [], -float("inf"), 0
+    while mdl.global_step < max_iterations and stale < patience:
+        mdl.train(min(chunk, max_iterations - mdl.global_step), workers=workers)
+        row = {"iteration": mdl.global_step, "ll_per_word": mdl.ll_per_word}
+        if coherence:
+            row["coherence"] = score_coherence(mdl, coherence, index)
+        rows.append(row)
+        # The log-likelihood is noisy, so progress is measured against the best so far.
+        # The first chunk always counts as progress, and chunks within the model's
+        # burn-in (before hyperparameter optimisation starts) never count as stale.
+        if best == -float("inf") or row["ll_per_word"] > best + tolerance * abs(best):
+            stale = 0
+        elif mdl.global_step > getattr(mdl, "burn_in", 0):
+            stale += 1
+        best = max(best, row["ll_per_word"])
+    return pd.DataFrame(rows)
+
+
+def train_lda(
+    corpus, params: dict, iterations=1000, workers=0, coherence="u_mass", tolerance=1e-3, index=None
+) -> tuple:
+    """Trains tp.LDAModel(**params) on a corpus from build_corpus for up to 'iterations',
+    stopping early once converged; returns (model, coherence score, training curve)."""
+    mdl = tp.LDAModel(corpus=corpus, **params)
+    curve = train_to_convergence(mdl, iterations, tolerance=tolerance, workers=workers)
+    return mdl, score_coherence(mdl, coherence, index), curve
+
+
+def _sweep_task(params, iterations, workers, coherence, tolerance):
+    start = time.perf_counter()
+    mdl, score, curve = train_lda(_corpus, params, iterations, workers, coherence, tolerance, _index)
+    return score, time.perf_counter() - start, curve, mdl.saves(full=True)
+
+
+def run_sweep(
+    corpus,
+    candidates: list,
+    base_params=None,
+    iterations=1000,
+    coherence="u_mass",
+    tolerance=1e-3,
+    cores=None,
+    registry=None,
+    corpus_id=None,
+    index=None,
+) -> tuple:
+    """Trains one LDA model per candidate parameter dict in a process pool.
+
+    'corpus' is a tp.utils.Corpus from build_corpus (token lists are indexed
+    here), so the documents are only ingested once for the whole sweep.
+    Coherence is scored from 'index', a CooccurrenceIndex over the same
+    documents (built here when token lists are passed), falling back to
+    tomotopy's own Coherence when there is none.
+
+    Each model trains until its log-likelihood converges (see
+    train_to_convergence) or for at most 'iterations'. Returns a table of the
+    candidates (in the order given) with their coherence scores, iterations
+    trained, final per-word log-likelihood and training times, and the
+    best-scoring model.
+
+    With a registry folder (see lda_registry), every trained model is saved
+    there and candidates already registered for this corpus are loaded instead
+    of retrained. 'corpus_id' is the corpus_hash of the documents; it is
+    computed here when token lists are passed.
+    """
+    base_params = base_params or {}
+    if not isinstance(corpus, tp.utils.Corpus):
+        corpus = [list(doc) for doc in corpus]
+        corpus_id = corpus_id or corpus_hash(corpus)
+        index = index or CooccurrenceIndex(corpus)
+        corpus = build_corpus(corpus)
+    if registry is not None and corpus_id is None:
+        raise ValueError("Pass corpus_id=corpus_hash(docs) to use a registry with a prebuilt corpus.")
+
+    rows, registered = [None] * len(candidates), {}
+    if registry is not None:
+        for i, params in enumerate(candidates):
+            entry = find_model(registry, {**base_params, **params}, corpus_id)
+            if entry is not None and entry["metadata"].get("coherence_measure") == coherence:
+                registered[i] = entry
+                rows[i] = {
+                    **params,
+                    "coherence": entry["coherence"],
+                    "iterations": entry["iterations"],
+                    "ll_per_word": entry["ll_per_word"],
+                    "seconds": 0.0,
+                }
+                print(f"  {params}: {coherence} coherence {entry['coherence']:.4f} (registered)", flush=True)
+    to_train = [i for i in range(len(candidates)) if i not in registered]
+
+    best_score, best_model = -float("inf"), None
+    if to_train:
+        processes, workers = plan_workers(len(to_train), cores)
+        print(
+            f"Training {len(to_train)} topic models: {processes} at a time, "
+            f"{workers} tomotopy worker(s) each",
+            flush=True,
+        )
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(corpus, index)) as pool:
+            futures = [
+                pool.submit(
+                    _sweep_task, {**base_params, **candidates[i]}, iterations, workers, coherence, tolerance
+                )
+                for i in to_train
+            ]
+            for i, future in zip(to_train, futures):
+                params = candidates[i]
+                score, seconds, curve, model_bytes = future.result()
+                last = curve.iloc[-1]
+                print(
+                    f"  {params}: {coherence} coherence {score:.4f} after "
+                    f"{last['iteration']:.0f} iterations ({seconds:.0f}s)",
+                    flush=True,
+                )
+                rows[i] = {
+                    **params,
+                    "coherence": score,
+                    "iterations": int(last["iteration"]),
+                    "ll_per_word": last["ll_per_word"],
+                    "seconds": seconds,
+                }
+                if registry is not None:
+                    register_model(
+                        registry,
+                        tp.LDAModel.loads(model_bytes),
+                        {**base_params, **params},
+                        score,
+                        corpus_id,
+                        coherence_measure=coherence,
+                    )
+                # Only the best trained model is kept in memory
+                if score > best_score:
+                    best_score, best_model = score, model_bytes
+    results = pd.DataFrame(rows)
+    results["rank"] = results["coherence"].rank(ascending=False, method="min").astype(int)
+    best = int(results["coherence"].idxmax())
+    if best in registered:
+        return results, load_model(registry, registered[best]["name"])[0]
+    return results, tp.LDAModel.loads(best_model)
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+from pyLDAvis import PreparedData, js_PCoA
+
+
+# pyLDAvis data computed directly with NumPy. pyLDAvis.prepare builds pandas
+# tables over the whole vocabulary for every lambda step; here the term marginals
+# use the whole vocabulary but relevance is only ranked over each topic's top_n
+# most probable terms, and no per-document arrays are needed.
+def model_arrays(mdl) -> tuple:
+    """(topic-term distributions, tokens per topic, vocabulary) from a trained tomotopy model."""
+    topic_term_dists = np.stack([mdl.get_topic_word_dist(k) for k in range(mdl.k)]).astype(np.float64)
+    topic_freq = np.asarray(mdl.get_count_by_topics(), dtype=np.float64)
+    return topic_term_dists, topic_freq, np.array(list(mdl.used_vocabs), dtype=object)
+
+
+def _top_relevance(log_ttd, log_lift, R, lambda_seq) -> list:
+    """For each topic, the terms in its top R by relevance at any lambda, in pyLDAvis' order."""
+    terms = []
+    for t in range(log_ttd.shape[0]):
+        seen = {}
+        for lambda_ in lambda_seq:
+            relevance = lambda_ * log_ttd[t] + (1 - lambda_) * log_lift[t]
+            top = np.argpartition(-relevance, R - 1)[:R]
+            for idx in top[np.lexsort((top, -relevance[top]))]:
+                seen.setdefault(idx, None)
+        terms.append(np.fromiter(seen, dtype=np.int64))
+    return terms
+
+
+def prepare_vis(
+    topic_term_dists,
+    topic_freq,
+    vocab,
+    R=30,
+    lambda_step=0.01,
+    top_n=1000,
+    sort_topics=False,
+    start_index=1,
+    plot_opts=None,
+) -> PreparedData:
+    """pyLDAvis-compatible data for pyLDAvis.save_html / pyLDAvis.display.
+
+    topic_freq is the number of tokens assigned to each topic. Only terms among
+    a topic's top_n most probable can appear in its relevance bars (None ranks
+    the whole vocabulary, matching pyLDAvis.prepare).
+    """
+    topic_term_dists = np.asarray(topic_term_dists, dtype=np.float64)
+    topic_freq = np.asarray(topic_freq, dtype=np.float64)
+    vocab = np.asarray(vocab, dtype=object)
+    n_topics, n_terms = topic_term_dists.shape
+    R = min(R, n_terms)
+    order = np.argsort(-topic_freq, kind="stable") if sort_topics else np.arange(n_topics)
+    topic_term_dists, topic_freq = topic_term_dists[order], topic_freq[order]
+    topic_proportion = topic_freq / topic_freq.sum()
+
+    # Token counts per topic and term (red bars) and per term (blue bars)
+    term_topic_freq = topic_term_dists * topic_freq[:, None]
+    term_frequency = term_topic_freq.sum(axis=0)
+    term_proportion = term_frequency / term_frequency.sum()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Saliency picks the terms shown when no topic is selected
+        topic_given_term = topic_term_dists / topic_term_dists.sum(axis=0)
+        kernel = topic_given_term * np.log(topic_given_term / topic_proportion[:, None])
+        saliency = term_proportion * np.nansum(kernel, axis=0)
+        log_ttd = np.log(topic_term_dists)
+        log_lift = np.log(topic_term_dists / term_proportion)
+
+    default = np.argsort(-saliency, kind="stable")[:R]
+    tables = [
+        pd.DataFrame(
+            {
+                "Term": vocab[default],
+                "Freq": np.floor(term_frequency[default]),
+                "Total": np.floor(term_frequency[default]),
+                "Category": "Default",
+                "logprob": np.arange(R, 0, -1),
+                "loglift": np.arange(R, 0, -1),
+            },
+            index=default,
+        )
+    ]
+
+    if top_n is None or top_n >= n_terms:
+        candidates = np.tile(np.arange(n_terms), (n_topics, 1))
+    else:
+        candidates = np.argpartition(-topic_term_dists, max(top_n, R) - 1, axis=1)[:, : max(top_n, R)]
+    lambda_seq = np.arange(0, 1 + lambda_step, lambda_step)
+    rows = np.arange(n_topics)[:, None]
+    top_terms = _top_relevance(log_ttd[rows, candidates], log_lift[rows, candidates], R, lambda_seq)
+    for t, ranked in enumerate(top_terms):
+        term_ix = candidates[t, ranked]
+        tables.append(
+            pd.DataFrame(
+                {
+                    "Term": vocab[term_ix],
+                    "Freq": term_topic_freq[t, term_ix],
+                    "Total": term_frequency[term_ix],
+                    "Category": f"Topic{t + start_index}",
+                    "logprob": log_ttd[t, term_ix].round(4),
+                    "loglift": log_lift[t, term_ix].round(4),
+                },
+                index=term_ix,
+            )
+        )
+    topic_info = pd.concat(tables)
+
+    # Topic sizes for every term that can be shown, for the circles when a term is selected
+    term_ix = np.sort(topic_info.index.unique())
+    freq = np.round(term_topic_freq[:, term_ix])
+    topic_idx, term_pos = np.nonzero(freq >= 0.5)
+    token_table = pd.DataFrame(
+        {
+            "Topic": topic_idx + start_index,
+            "Freq": freq[topic_idx, term_pos] / term_frequency[term_ix[term_pos]],
+            "Term": vocab[term_ix[term_pos]],
+        },
+        index=pd.Index(term_ix[term_pos], name="term"),
+    ).sort_values(by=["Term", "Topic"])
+
+    coordinates = js_PCoA(topic_term_dists)
+    topic_coordinates = pd.DataFrame(
+        {
+            "x": coordinates[:, 0],
+            "y": coordinates[:, 1],
+            "topics": range(start_index, n_topics + start_index),
+            "cluster": 1,
+            "Freq": topic_proportion * 100,
+        }
+    )
+    return PreparedData(
+        topic_coordinates,
+        topic_info,
+        token_table,
+        R,
+        lambda_step,
+        plot_opts or {"xlab": "PC1", "ylab": "PC2"},
+        [int(t) + start_index for t in order],
+    )
+
+
+def prepare_model(mdl, R=30, top_n=1000, sort_topics=False, start_index=1) -> PreparedData:
+    topic_term_dists, topic_freq, vocab = model_arrays(mdl)
+    return prepare_vis(topic_term_dists, topic_freq, vocab, R, top_n=top_n, sort_topics=sort_topics,
+                       start_index=start_index)
@@ -0,0 +1,103 @@
+import time
+import warnings
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.exceptions import ConvergenceWarning
+
+
+# Fitting within a fixed number of seconds. Each strategy reports progress and
+# stops before the next step would overrun the budget, returning the best model
+# it has finished so far.
+def _progress(done, total, unit, elapsed, seconds_per_unit, budget):
+    remaining = (total - done) * seconds_per_unit
+    print(
+        f"  {done:,}/{total:,} {unit} - {elapsed:,.0f}s elapsed, "
+        f"~{remaining:,.0f}s to finish, budget {budget:,.0f}s",
+        flush=True,
+    )
+
+
+def _fit_forest(model, x, y, budget, start):
+    total = model.get_params()["n_estimators"]
+    step = max(10, total // 20)
+    model.set_params(warm_start=True, n_estimators=0)
+    while model.n_estimators < total:
+        step_start = time.perf_counter()
+        model.set_params(n_estimators=min(model.n_estimators + step, total))
+        model.fit(x, y)
+        elapsed = time.perf_counter() - start
+        step_seconds = time.perf_counter() - step_start
+        _progress(model.n_estimators, total, "trees", elapsed, step_seconds / step, budget)
+        if elapsed + step_seconds > budget and model.n_estimators < total:
+            print(f"Time budget reached - keeping {model.n_estimators} of {total} trees.")
+            return model, False
+    return model, True
+
+
+def _fit_iterative(model, x, y, budget, start):
+    total = model.get_params()["max_iter"]
+    step = max(5, total // 20)
+    model.set_params(warm_start=True, max_iter=step)
+    done = 0
+    with warnings.catch_warnings():
+        # Each chunk stops at max_iter on purpose
+        warnings.simplefilter("ignore", category=ConvergenceWarning)
+        while done < total:
+            step_start = time.perf_counter()
+            model.set_params(max_iter=min(step, total - done))
+            model.fit(x, y)
+            iterations = int(np.max(model.n_iter_))
+            done += iterations
+            elapsed = time.perf_counter() - start
+            step_seconds = time.perf_counter() - step_start
+            if iterations < model.max_iter:
+                print(f"  Converged after {done:,} iterations ({elapsed:,.0f}s).")
+                return model, True
+            _progress(done, total, "iterations", elapsed, step_seconds / iterations, budget)
+            if elapsed + step_seconds > budget and done < total:
+                print(f"Time budget reached - stopping after {done:,} of {total:,} iterations.")
+                return model, False
+    return model, True
+
+
+def _fit_subsamples(model, x, y, budget, start, seed):
+    # Models that can't be paused mid-fit are refit on growing random subsets;
+    # the next size is only attempted if its predicted time fits the budget.
+    n = x.shape[0]
+    order = np.random.default_rng(seed).permutation(n)
+    size = min(n, 2000)
+    previous_size, previous_seconds = None, None
+    while True:
+        rows = np.sort(order[:size])
+        step_start = time.perf_counter()
+        best = clone(model).fit(x[rows], y[rows])
+        seconds = time.perf_counter() - step_start
+        elapsed = time.perf_counter() - start
+        print(f"  Fit on {size:,}/{n:,} texts in {seconds:,.0f}s ({elapsed:,.0f}s elapsed)", flush=True)
+        if size == n:
+            return best, True
+        next_size = min(n, size * 2)
+        # Scale by the growth rate seen so far (at least linear)
+        exponent = 2.0
+        if previous_seconds:
+            exponent = max(1.0, np.log(seconds / previous_seconds) / np.log(size / previous_size))
+        estimate = seconds * (next_size / size) ** exponent
+        if elapsed + estimate > budget:
+            print(f"Time budget reached - keeping the model fit on {size:,} of {n:,} texts.")
+            return best, False
+        previous_size, previous_seconds = size, seconds
+        size = next_size
+
+
+def fit_with_budget(model, x, y, budget_seconds, seed=24601) -> tuple:
+    """Fits 'model' within roughly budget_seconds; returns (model, finished)."""
+    y = np.asarray(y)
+    params = model.get_params()
+    start = time.perf_counter()
+    print(f"Fitting {type(model).__name__} with a {budget_seconds:,.0f}s budget...", flush=True)
+    if "n_estimators" in params and "warm_start" in params:
+        return _fit_forest(model, x, y, budget_seconds, start)
+    if "max_iter" in params and "warm_start" in params and params.get("solver") != "liblinear":
+        return _fit_iterative(model, x, y, budget_seconds, start)
+    return _fit_subsamples(model, x, y, budget_seconds, start, seed)
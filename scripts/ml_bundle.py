@@ -0,0 +1,268 @@
+import argparse
+import json
+import queue
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import joblib
+import pandas as pd
+import sklearn
+
+
+# A model bundle is a folder holding the fitted vectorizer, the fitted classifier
+# and a metadata.json, so new texts can be scored without retraining.
+def save_bundle(directory, vectorizer, classifier, **metadata) -> Path:
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    joblib.dump(vectorizer, directory / "vectorizer.joblib")
+    joblib.dump(classifier, directory / "classifier.joblib")
+    metadata.update(
+        {
+            "vectorizer": type(vectorizer).__name__,
+            "classifier": type(classifier).__name__,
+            "classes": [str(c) for c in getattr(classifier, "classes_", [])],
+            "sklearn_version": sklearn.__version__,
+            "saved": datetime.now().isoformat(timespec="seconds"),
+        }
+    )
+    with open(directory / "metadata.json", "w", encoding="utf-8") as outfile:
+        json.dump(metadata, outfile, indent=2, default=str)
+    return directory
+
+
+def load_bundle(directory) -> tuple:
+    directory = Path(directory)
+    vectorizer = joblib.load(directory / "vectorizer.joblib")
+    classifier = joblib.load(directory / "classifier.joblib")
+    with open(directory / "metadata.json", "r", encoding="utf-8") as infile:
+        metadata = json.load(infile)
+    if metadata.get("sklearn_version") != sklearn.__version__:
+        print(
+            f"Warning: bundle was saved with scikit-learn {metadata.get('sklearn_version')}, "
+            f"running {sklearn.__version__}"
+        )
+    return vectorizer, classifier, metadata
+
+
+def predict_texts(vectorizer, classifier, texts: list, class_names=None) -> pd.DataFrame:
+    predictions = classifier.predict(vectorizer.transform(texts))
+    results = pd.DataFrame({"prediction": predictions})
+    if class_names:
+        results["label"] = [class_names[int(p)] for p in predictions]
+    return results
+
+
+def read_texts(path, text_column="text") -> pd.DataFrame:
+    """A .csv with a text column, a .txt with one document per line, or a folder of .txt files."""
+    path = Path(path)
+    if path.is_dir():
+        files = sorted(path.glob("*.txt"))
+        return pd.DataFrame(
+            {"name": [f.stem for f in files], text_column: [f.read_text(encoding="utf-8") for f in files]}
+        )
+    if path.suffix == ".csv":
+        data = pd.read_csv(path)
+        if text_column not in data.columns:
+            raise ValueError(f"{path} does not contain a '{text_column}' column.")
+        data[text_column] = data[text_column].fillna("").astype(str)
+        return data
+    with open(path, "r", encoding="utf-8") as infile:
+        return pd.DataFrame({text_column: [line.strip() for line in infile if line.strip()]})
+
+
+def predict_file(bundle_dir, input_path, output_path, text_column="text", batch_size=5000):
+    vectorizer, classifier, metadata = load_bundle(bundle_dir)
+    data = read_texts(input_path, text_column)
+    texts = data[text_column].tolist()
+    batches = [
+        predict_texts(vectorizer, classifier, texts[i : i + batch_size], metadata.get("class_names"))
+        for i in range(0, len(texts), batch_size)
+    ]
+    results = pd.concat([data.reset_index(drop=True), pd.concat(batches, ignore_index=True)], axis=1)
+    results.to_csv(output_path, index=False, encoding="utf-8")
+    print(f"Saved {len(results)} predictions to {output_path}")
+
+
+class MicroBatcher:
+    """Collects texts from concurrent requests and scores them together.
+
+    A batch is sent to the vectorizer/classifier once it holds max_batch texts
+    or max_wait seconds have passed since its first request arrived.
+    """
+
+    def __init__(self, vectorizer, classifier, class_names=None, max_batch=256, max_wait=0.02):
+        self.vectorizer = vectorizer
+        self.classifier = classifier
+        self.class_names = class_names
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.requests = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def predict(self, texts: list) -> list:
+        done = threading.Event()
+        request = {"texts": texts, "done": done}
+        self.requests.put(request)
+        done.wait()
+        if "error" in request:
+            raise request["error"]
+        return request["results"]
+
+    def _run(self):
+        while True:
+            batch = [self.requests.get()]
+            try:
+                n_texts = len(batch[0]["texts"])
+                deadline = time.monotonic() + self.max_wait
+                while n_texts < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self.requests.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                    n_texts += len(batch[-1]["texts"])
+                texts = [text for request in batch for text in request["texts"]]
+                results = predict_texts(self.vectorizer, self.classifier, texts, self.class_names)
+                records = results.to_dict(orient="records")
+                start = 0
+                for request in batch:
+                    request["results"] = records[start : start + len(request["texts"])]
+                    start += len(request["texts"])
+            except Exception as e:
+                for request in batch:
+                    request["error"] = e
+            for request in batch:
+                request["done"].set()
+
+
+class PredictionServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 drops connections from a burst of concurrent requests
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def serve(bundle_dir, host="127.0.0.1", port=8000, max_batch=256, max_wait=0.02, backlog=128):
+    vectorizer, classifier, metadata = load_bundle(bundle_dir)
+    batcher = MicroBatcher(vectorizer, classifier, metadata.get("class_names"), max_batch, max_wait)
+
+    class PredictHandler(BaseHTTPRequestHandler):
+        def _reply(self, status, payload):
+            body = json.dumps(payload, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._reply(200, metadata)
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._reply(404, {"error": "POST texts to /predict"})
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                texts = payload["texts"]
+                if isinstance(texts, str):
+                    texts = [texts]
+                if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                    raise TypeError("texts must be a string or a list of strings")
+            except (ValueError, KeyError, TypeError):
+                self._reply(400, {"error": 'Expected a JSON body like {"texts": ["..."]}'})
+                return
+            try:
+                predictions = batcher.predict(texts)
+            except Exception as e:
+                self._reply(500, {"error": f"Prediction failed: {e}"})
+                return
+            self._reply(200, {"predictions": predictions})
+
+    server = PredictionServer((host, port), PredictHandler, bind_and_activate=False)
+    server.request_queue_size = backlog
+    try:
+        server.server_bind()
+        server.server_activate()
+    except OSError:
+        server.server_close()
+        raise
+    print(f"Serving {metadata.get('name', bundle_dir)} on http://{host}:{port}/predict (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def burst(url, n_requests=50, text="A test review.", timeout=30) -> list:
+    """Sends n_requests POSTs to a running service at once; returns the errors
+    (an empty list when every request got a 200 with one prediction)."""
+    body = json.dumps({"texts": [text]}).encode("utf-8")
+    start = threading.Barrier(n_requests)
+    failures = []
+
+    def send():
+        start.wait()
+        try:
+            request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                if len(json.loads(response.read())["predictions"]) != 1:
+                    failures.append("wrong number of predictions")
+        except Exception as e:
+            failures.append(repr(e))
+
+    threads = [threading.Thread(target=send) for _ in range(n_requests)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score texts with a saved model bundle.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    predict_parser = commands.add_parser("predict", help="Score a .csv, .txt or folder of .txt files")
+    predict_parser.add_argument("bundle")
+    predict_parser.add_argument("input")
+    predict_parser.add_argument("output")
+    predict_parser.add_argument("--text-column", default="text")
+    predict_parser.add_argument("--batch-size", type=int, default=5000)
+
+    serve_parser = commands.add_parser("serve", help="Run a local HTTP prediction service")
+    serve_parser.add_argument("bundle")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument("--max-batch", type=int, default=256)
+    serve_parser.add_argument("--max-wait-ms", type=float, default=20)
+    serve_parser.add_argument("--backlog", type=int, default=128, help="Connections allowed to wait for a thread")
+
+    burst_parser = commands.add_parser("burst", help="Check a running service with concurrent requests")
+    burst_parser.add_argument("--url", default="http://127.0.0.1:8000/predict")
+    burst_parser.add_argument("--requests", type=int, default=50)
+    burst_parser.add_argument("--text", default="A test review.")
+
+    args = parser.parse_args()
+    if args.command == "predict":
+        predict_file(args.bundle, args.input, args.output, args.text_column, args.batch_size)
+    elif args.command == "serve":
+        serve(args.bundle, args.host, args.port, args.max_batch, args.max_wait_ms / 1000, args.backlog)
+    else:
+        failures = burst(args.url, args.requests, args.text)
+        print(f"{args.requests - len(failures)} of {args.requests} concurrent requests succeeded")
+        for failure in failures[:10]:
+            print(f"  {failure}")
+        if failures:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
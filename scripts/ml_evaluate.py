@@ -0,0 +1,101 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from scipy.stats import binomtest, chi2
+
+
+# Comparing several binary classifiers on the same test set. Every model is scored
+# on the same bootstrap resamples, so differences between models are paired.
+def _confusion_codes(y_true, y_pred, positive):
+    # 0 = true negative, 1 = false positive, 2 = false negative, 3 = true positive
+    return (2 * (np.asarray(y_true) == positive) + (np.asarray(y_pred) == positive)).astype(np.int8)
+
+
+def _resample_counts(codes, n_boot, seed, chunk) -> np.ndarray:
+    """(n_models, n_boot, 4) confusion counts for one chunk of bootstrap resamples."""
+    n_models, n = codes.shape
+    # Seeded per chunk so results don't depend on how chunks are scheduled
+    idx = np.random.default_rng([seed, chunk]).integers(0, n, size=(n_boot, n), dtype=np.int32)
+    # One model at a time keeps the temporary (n_boot, n) int32 arrays small
+    offsets = 4 * np.arange(n_boot, dtype=np.int32).reshape(n_boot, 1)
+    counts = np.empty((n_models, n_boot, 4), dtype=np.int64)
+    for model in range(n_models):
+        flat = codes[model].astype(np.int32)[idx] + offsets
+        counts[model] = np.bincount(flat.ravel(), minlength=4 * n_boot).reshape(n_boot, 4)
+    return counts
+
+
+def _metrics(counts) -> dict:
+    counts = np.asarray(counts, dtype=np.float64)
+    tn, fp, fn, tp = (counts[..., i] for i in range(4))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denominator = np.sqrt((tp + fp) * (tp + fn) * (tn + fp) * (tn + fn))
+        return {
+            "accuracy": (tp + tn) / counts.sum(axis=-1),
+            "mcc": np.where(denominator > 0, (tp * tn - fp * fn) / denominator, 0.0),
+            "f1": np.where(tp > 0, 2 * tp / (2 * tp + fp + fn), 0.0),
+        }
+
+
+def mcnemar(correct_a, correct_b) -> tuple:
+    """McNemar's test on paired correctness; exact binomial when discordant pairs < 25."""
+    only_a = int(np.sum(correct_a & ~correct_b))
+    only_b = int(np.sum(~correct_a & correct_b))
+    if only_a + only_b == 0:
+        return 0.0, 1.0
+    if only_a + only_b < 25:
+        return float(min(only_a, only_b)), binomtest(only_a, only_a + only_b).pvalue
+    statistic = (abs(only_a - only_b) - 1) ** 2 / (only_a + only_b)
+    return statistic, chi2.sf(statistic, 1)
+
+
+def compare_models(
+    y_true, predictions: dict, positive=1, n_boot=2000, alpha=0.05, seed=24601, n_jobs=-1
+) -> tuple:
+    """Returns (metrics table, pairwise table) for {model name: predictions}.
+
+    The metrics table has accuracy, MCC (phi) and F1 with percentile bootstrap
+    intervals. The pairwise table has each pair's accuracy difference with its
+    paired bootstrap interval and McNemar's test.
+    """
+    y_true = np.asarray(y_true)
+    names = list(predictions)
+    codes = np.stack([_confusion_codes(y_true, predictions[name], positive) for name in names])
+    chunk_size = 100
+    chunks = Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(_resample_counts)(codes, min(chunk_size, n_boot - start), seed, chunk)
+        for chunk, start in enumerate(range(0, n_boot, chunk_size))
+    )
+    boot = {name: _metrics(counts) for name, counts in zip(names, np.concatenate(chunks, axis=1))}
+    bounds = [100 * alpha / 2, 100 * (1 - alpha / 2)]
+
+    rows = []
+    for name, model_codes in zip(names, codes):
+        point = _metrics(np.bincount(model_codes, minlength=4))
+        row = {"model": name}
+        for metric in ("accuracy", "mcc", "f1"):
+            low, high = np.percentile(boot[name][metric], bounds)
+            row.update({metric: float(point[metric]), f"{metric}_low": low, f"{metric}_high": high})
+        rows.append(row)
+
+    pairs = []
+    for a, b in itertools.combinations(names, 2):
+        differences = boot[a]["accuracy"] - boot[b]["accuracy"]
+        low, high = np.percentile(differences, bounds)
+        correct_a = np.asarray(predictions[a]) == y_true
+        correct_b = np.asarray(predictions[b]) == y_true
+        statistic, p_value = mcnemar(correct_a, correct_b)
+        pairs.append(
+            {
+                "model_a": a,
+                "model_b": b,
+                "accuracy_diff": correct_a.mean() - correct_b.mean(),
+                "diff_low": low,
+                "diff_high": high,
+                "mcnemar": statistic,
+                "p_value": p_value,
+            }
+        )
+    return pd.DataFrame(rows), pd.DataFrame(pairs)
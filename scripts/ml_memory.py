@@ -0,0 +1,61 @@
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+# Keeping feature matrices compact and reporting what each stage holds in memory
+def compact_matrix(x, dtype=np.float32, dense=False):
+    """float32 values and int32 sparse indices; only densify when dense=True."""
+    if not sparse.issparse(x):
+        return np.asarray(x, dtype=dtype)
+    x = x.tocsr().astype(dtype, copy=False)
+    if max(x.nnz, x.shape[1]) < np.iinfo(np.int32).max:
+        x.indices = x.indices.astype(np.int32, copy=False)
+        x.indptr = x.indptr.astype(np.int32, copy=False)
+    return x.toarray() if dense else x
+
+
+def nbytes(obj) -> int:
+    """Approximate bytes held by a matrix, DataFrame, list of texts or dataset."""
+    if sparse.issparse(obj):
+        obj = obj.tocsr()
+        return obj.data.nbytes + obj.indices.nbytes + obj.indptr.nbytes
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    if hasattr(obj, "indices") and hasattr(obj, "dataset"):
+        # A torch Subset only holds indices into its parent dataset
+        return sys.getsizeof(obj.indices) + 8 * len(obj.indices)
+    if hasattr(obj, "__dict__") and not isinstance(obj, type):
+        return sum(nbytes(value) for value in vars(obj).values())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(nbytes(item) for item in obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(nbytes(k) + nbytes(v) for k, v in obj.items())
+    return sys.getsizeof(obj)
+
+
+def _describe(obj) -> str:
+    if hasattr(obj, "shape"):
+        dtype = getattr(obj, "dtype", "")
+        if sparse.issparse(obj):
+            return f"sparse {obj.shape} {dtype}, int{obj.indices.dtype.itemsize * 8} indices, {obj.nnz:,} stored"
+        return f"{type(obj).__name__} {obj.shape} {dtype}".rstrip()
+    if hasattr(obj, "__len__"):
+        return f"{type(obj).__name__} of {len(obj):,}"
+    return type(obj).__name__
+
+
+def memory_report(stage: str, **objects):
+    print(f"\n====Memory held after {stage}====")
+    total = 0
+    for name, obj in objects.items():
+        size = nbytes(obj)
+        total += size
+        print(f"{name:.<32} {size / 2**20:>10,.1f} MB  {_describe(obj)}")
+    print(f"{'Total':.<32} {total / 2**20:>10,.1f} MB", flush=True)
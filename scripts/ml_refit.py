@@ -0,0 +1,90 @@
+import copy
+import hashlib
+import math
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
+
+# Hyperparameters that can change between fits while still continuing from the
+# previous model's state (coefficients for logistic regression, trees for forests)
+WARM_START_PARAMS = {
+    "LogisticRegression": {"C", "max_iter", "tol"},
+    "RandomForestClassifier": {"n_estimators"},
+    "ExtraTreesClassifier": {"n_estimators"},
+}
+
+
+def array_hash(x) -> str:
+    """Content hash of a dense/sparse matrix or label vector."""
+    x = x if sparse.issparse(x) else np.asarray(x)
+    digest = hashlib.sha1(str(x.shape).encode())
+    parts = (x.data, x.indices, x.indptr) if sparse.issparse(x) else (x,)
+    for part in parts:
+        digest.update(np.ascontiguousarray(part).view(np.uint8))
+    return digest.hexdigest()
+
+
+class FitCache:
+    """Memoizes fitted models by (model, hyperparameters, training data) and
+    warm-starts new fits from the closest previous fit where the model allows it.
+    At most max_models fitted models are kept; the least recently used is dropped first."""
+
+    def __init__(self, max_models=4):
+        self.max_models = max_models
+        self.fits = OrderedDict()
+        self._hashes = {}
+
+    def _data_hash(self, x) -> str:
+        # Keep a reference to x so its id can't be reused by another object; the
+        # reference is dropped once no cached fit uses this data (see fit)
+        if id(x) not in self._hashes:
+            self._hashes[id(x)] = (x, array_hash(x))
+        return self._hashes[id(x)][1]
+
+    def _warm_start_from(self, name, params, data_key):
+        changeable = WARM_START_PARAMS.get(name)
+        if not changeable or params.get("solver") == "liblinear":
+            return None
+        best, best_distance = None, math.inf
+        for (cached_name, _, cached_data), (cached_params, model) in self.fits.items():
+            if cached_name != name or cached_data != data_key:
+                continue
+            if any(params[p] != cached_params[p] for p in params if p not in changeable):
+                continue
+            if "n_estimators" in changeable:
+                if cached_params["n_estimators"] > params["n_estimators"]:
+                    continue
+                distance = params["n_estimators"] - cached_params["n_estimators"]
+            else:
+                distance = abs(math.log(params["C"]) - math.log(cached_params["C"]))
+            if distance < best_distance:
+                best, best_distance = model, distance
+        return best
+
+    def fit(self, model, x, y) -> tuple:
+        """Returns the fitted model and how it was obtained: 'cached', 'warm' or 'fresh'."""
+        name = type(model).__name__
+        params = model.get_params()
+        data_key = (self._data_hash(x), array_hash(y))
+        key = (name, repr(sorted(params.items())), data_key)
+        if key in self.fits:
+            self.fits.move_to_end(key)
+            return self.fits[key][1], "cached"
+
+        previous = self._warm_start_from(name, params, data_key)
+        if previous is not None:
+            # Copy so the cached model stays as it was fit
+            model = copy.deepcopy(previous)
+            model.set_params(**{p: params[p] for p in WARM_START_PARAMS[name]}, warm_start=True)
+            source = "warm"
+        else:
+            source = "fresh"
+        model.fit(x, y)
+        self.fits[key] = (params, model)
+        while len(self.fits) > self.max_models:
+            self.fits.popitem(last=False)
+        # Release the matrices that no cached fit was trained on any more
+        in_use = {data_key[0] for _, _, data_key in self.fits}
+        self._hashes = {i: entry for i, entry in self._hashes.items() if entry[1] in in_use}
+        return model, source
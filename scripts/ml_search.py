@@ -0,0 +1,98 @@
+import math
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+
+# Parallel hyperparameter search scored on a held-out validation split
+def candidate_list(space, n_iter=None, seed=24601) -> list:
+    """Every combination in 'space', or 'n_iter' random draws from it. 'space' is a
+    dict of value lists, or a list of such dicts for parameters that only apply
+    together (e.g. gamma only with the rbf kernel)."""
+    if n_iter is None:
+        return list(ParameterGrid(space))
+    return list(ParameterSampler(space, n_iter=n_iter, random_state=seed))
+
+
+def _fit_and_score(estimator, params, x_train, y_train, x_val, y_val, scoring):
+    model = clone(estimator).set_params(**params)
+    # The search already runs one candidate per core
+    if model.get_params().get("n_jobs") not in (None, 1):
+        model.set_params(n_jobs=1)
+    start = time.perf_counter()
+    model.fit(x_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    return scoring(y_val, model.predict(x_val)), fit_seconds
+
+
+def _halving_sizes(n_candidates, n_train, factor, min_samples) -> list:
+    rounds = 1
+    if n_candidates > 1:
+        rounds = 1 + min(
+            math.ceil(math.log(n_candidates, factor)),
+            max(0, math.floor(math.log(max(n_train / min_samples, 1), factor))),
+        )
+    return [int(n_train / factor ** (rounds - 1 - r)) for r in range(rounds)]
+
+
+def run_search(
+    estimator,
+    space,
+    x_train,
+    y_train,
+    x_val,
+    y_val,
+    n_iter=None,
+    halving=False,
+    factor=3,
+    min_samples=1000,
+    scoring=accuracy_score,
+    n_jobs=-1,
+    seed=24601,
+) -> pd.DataFrame:
+    """Fit every candidate in 'space' in parallel and rank them by validation score.
+
+    With halving=True candidates start on a small random slice of the training
+    data and only the best 1/factor of them move on to the next, 'factor'-times
+    larger slice (successive halving); the last round uses all training rows.
+    """
+    candidates = candidate_list(space, n_iter, seed)
+    y_train = np.asarray(y_train)
+    y_val = np.asarray(y_val)
+    n_train = len(y_train)
+    order = np.random.default_rng(seed).permutation(n_train)
+
+    sizes = _halving_sizes(len(candidates), n_train, factor, min_samples) if halving else [n_train]
+    results = [{"params": params, "score": np.nan, "n_train": 0, "fit_seconds": 0.0, "rounds": 0}
+               for params in candidates]
+    alive = list(range(len(candidates)))
+    for round_idx, size in enumerate(sizes):
+        rows = np.sort(order[:size])
+        x_slice, y_slice = x_train[rows], y_train[rows]
+        scores = Parallel(n_jobs=n_jobs)(
+            delayed(_fit_and_score)(
+                estimator, candidates[c], x_slice, y_slice, x_val, y_val, scoring
+            )
+            for c in alive
+        )
+        for c, (score, fit_seconds) in zip(alive, scores):
+            results[c].update(score=score, n_train=size, fit_seconds=fit_seconds, rounds=round_idx + 1)
+        if round_idx < len(sizes) - 1:
+            keep = max(1, math.ceil(len(alive) / factor))
+            alive = sorted(alive, key=lambda c: results[c]["score"], reverse=True)[:keep]
+
+    table = pd.concat(
+        [pd.DataFrame([r["params"] for r in results]), pd.DataFrame(results)], axis=1
+    )
+    table = table.sort_values(["n_train", "score"], ascending=False, ignore_index=True)
+    table.insert(0, "rank", range(1, len(table) + 1))
+    return table
+
+
+def print_search(table: pd.DataFrame):
+    print(table.drop(columns="params").to_string(index=False, float_format="{:.4f}".format))
@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin, clone
+from sklearn.feature_selection import chi2, mutual_info_classif
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score
+
+SELECTION_METHODS = ("chi2", "mutual_info", "l1")
+
+
+# Supervised feature selection: rank the columns once, then any top-k is a slice
+def rank_features(x, y, method="chi2", seed=24601) -> np.ndarray:
+    """Column indices ordered from most to least discriminative."""
+    if method == "chi2":
+        scores, _ = chi2(x, y)
+    elif method == "mutual_info":
+        # Mutual information between term presence and the label
+        presence = (x > 0).astype(np.int8)
+        scores = mutual_info_classif(presence, y, discrete_features=True, random_state=seed)
+    elif method == "l1":
+        l1_model = LogisticRegression(penalty="l1", solver="liblinear", C=1.0).fit(x, y)
+        scores = np.abs(l1_model.coef_).sum(axis=0)
+    else:
+        raise ValueError(f"Unknown feature selection method '{method}'. Use one of {SELECTION_METHODS}.")
+    return np.argsort(-np.nan_to_num(scores), kind="stable")
+
+
+class ColumnSelector(BaseEstimator, TransformerMixin):
+    """Keeps a fixed set of columns, e.g. to put a selection into a saved pipeline."""
+
+    def __init__(self, columns=None):
+        self.columns = columns
+
+    def fit(self, x, y=None):
+        return self
+
+    def transform(self, x):
+        return x[:, self.columns]
+
+
+def k_report(estimator, ranking, ks, x_train, y_train, x_val, y_val, scoring=accuracy_score) -> pd.DataFrame:
+    """Training time and validation score of 'estimator' on the top-k columns for each k."""
+    rows = []
+    for k in ks:
+        columns = np.sort(ranking[:k])
+        model = clone(estimator)
+        start = time.perf_counter()
+        model.fit(x_train[:, columns], y_train)
+        fit_seconds = time.perf_counter() - start
+        rows.append(
+            {
+                "k": len(columns),
+                "fit_seconds": fit_seconds,
+                "score": scoring(y_val, model.predict(x_val[:, columns])),
+            }
+        )
+    return pd.DataFrame(rows)
@@ -0,0 +1,173 @@
+import re
+import zlib
+from collections import Counter
+
+import numpy as np
+import torch
+from torch import nn
+from torch.utils.data import DataLoader, Dataset, Sampler
+
+
+# fastText-style bag-of-ngrams classifier. Each text becomes one flat list of
+# unigram ids plus hashed bigram ids, and an EmbeddingBag averages their vectors
+# using per-text offsets, so batches never need padding. Id 0 is reserved for
+# texts with no known words: its vector stays zero and is left out of the mean.
+PAD_ID = 0
+
+
+def tokenize(text: str) -> list:
+    return re.findall(r"[a-z0-9']+", text.lower().replace("<br />", " "))
+
+
+def build_vocab(texts, min_count=2, max_size=100000) -> dict:
+    counts = Counter(token for text in texts for token in tokenize(text))
+    most_common = [w for w, c in counts.most_common(max_size) if c >= min_count]
+    return {word: idx for idx, word in enumerate(most_common)}
+
+
+def n_ids(vocab: dict, n_buckets: int) -> int:
+    """Embedding rows needed: PAD_ID, the vocabulary, then the bigram buckets."""
+    return 1 + len(vocab) + n_buckets
+
+
+def encode(text: str, vocab: dict, n_buckets: int) -> np.ndarray:
+    """Unigram ids in [1, len(vocab)] followed by bigram ids hashed into n_buckets more
+    (just PAD_ID when the text has neither)."""
+    tokens = tokenize(text)
+    ids = [1 + vocab[t] for t in tokens if t in vocab]
+    ids += [
+        1 + len(vocab) + zlib.crc32(f"{a} {b}".encode("utf-8")) % n_buckets
+        for a, b in zip(tokens, tokens[1:])
+    ]
+    return np.array(ids or [PAD_ID], dtype=np.int32)
+
+
+class EncodedDataset(Dataset):
+    """Encodes a (text, label) dataset once so workers only have to batch ids."""
+
+    def __init__(self, dataset, vocab, n_buckets):
+        self.ids = [encode(text, vocab, n_buckets) for text, _ in dataset]
+        self.labels = [label for _, label in dataset]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, idx):
+        return self.ids[idx], self.labels[idx]
+
+
+def collate_bags(batch):
+    ids, labels = zip(*batch)
+    offsets = np.cumsum([0] + [len(i) for i in ids[:-1]])
+    return (
+        torch.from_numpy(np.concatenate(ids).astype(np.int64)),
+        torch.from_numpy(offsets),
+        torch.tensor(labels, dtype=torch.long),
+    )
+
+
+class LengthBucketSampler(Sampler):
+    """Batches texts of similar length together (sorted within pools of
+    pool_size batches), then shuffles the order of the batches."""
+
+    def __init__(self, lengths, batch_size, shuffle=True, pool_size=50, seed=24601):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.pool_size = pool_size
+        self.rng = np.random.default_rng(seed)
+
+    def __iter__(self):
+        order = self.rng.permutation(len(self.lengths)) if self.shuffle else np.arange(len(self.lengths))
+        pool = self.batch_size * self.pool_size
+        batches = []
+        for start in range(0, len(order), pool):
+            chunk = order[start : start + pool]
+            chunk = chunk[np.argsort(self.lengths[chunk], kind="stable")]
+            batches += [chunk[i : i + self.batch_size].tolist() for i in range(0, len(chunk), self.batch_size)]
+        if self.shuffle:
+            self.rng.shuffle(batches)
+        return iter(batches)
+
+    def __len__(self):
+        return -(-len(self.lengths) // self.batch_size)
+
+
+def make_loader(encoded: EncodedDataset, batch_size, shuffle=False, num_workers=0) -> DataLoader:
+    sampler = LengthBucketSampler([len(i) for i in encoded.ids], batch_size, shuffle)
+    return DataLoader(
+        encoded,
+        batch_sampler=sampler,
+        collate_fn=collate_bags,
+        num_workers=num_workers,
+        persistent_workers=num_workers > 0,
+    )
+
+
+class BagOfNgramsClassifier(nn.Module):
+    def __init__(self, n_ids, n_classes, dim=64):
+        super().__init__()
+        self.embedding = nn.EmbeddingBag(n_ids, dim, mode="mean", sparse=True, padding_idx=PAD_ID)
+        self.output = nn.Linear(dim, n_classes)
+
+    def forward(self, ids, offsets):
+        return self.output(self.embedding(ids, offsets))
+
+
+def predict(model, loader, device="cpu") -> tuple:
+    """Predictions and labels in dataset order (the loader must not shuffle)."""
+    model.eval()
+    predictions, labels = [], []
+    with torch.no_grad():
+        for ids, offsets, batch_labels in loader:
+            logits = model(ids.to(device), offsets.to(device))
+            predictions.append(logits.argmax(dim=1).cpu().numpy())
+            labels.append(batch_labels.numpy())
+    # Undo the length bucketing
+    restore = np.argsort(np.concatenate(list(loader.batch_sampler)))
+    return np.concatenate(predictions)[restore], np.concatenate(labels)[restore]
+
+
+def train_classifier(model, train_loader, val_loader, epochs=20, lr=0.01, patience=2, device="cpu"):
+    """Trains until validation accuracy stops improving for 'patience' epochs and
+    returns the model with the best validation weights restored."""
+    model.to(device)
+    # The embedding gradients are sparse, so it gets its own optimizer
+    optimizers = [
+        torch.optim.SparseAdam(model.embedding.parameters(), lr=lr),
+        torch.optim.Adam(model.output.parameters(), lr=lr),
+    ]
+    loss_fn = nn.CrossEntropyLoss()
+    # The best weights are copied into one preallocated CPU buffer rather than a new copy per epoch
+    best_state = {name: torch.empty_like(value, device="cpu") for name, value in model.state_dict().items()}
+    best_accuracy, stale_epochs = -1.0, 0
+    for epoch in range(1, epochs + 1):
+        model.train()
+        total_loss = 0.0
+        for ids, offsets, labels in train_loader:
+            for optimizer in optimizers:
+                optimizer.zero_grad()
+            loss = loss_fn(model(ids.to(device), offsets.to(device)), labels.to(device))
+            loss.backward()
+            for optimizer in optimizers:
+                optimizer.step()
+            total_loss += loss.item() * len(labels)
+
+        predictions, labels = predict(model, val_loader, device)
+        accuracy = (predictions == labels).mean()
+        print(
+            f"Epoch {epoch}: training loss {total_loss / len(train_loader.dataset):.4f}, "
+            f"validation accuracy {accuracy:.2%}",
+            flush=True,
+        )
+        if accuracy > best_accuracy:
+            best_accuracy, stale_epochs = accuracy, 0
+            for name, value in model.state_dict().items():
+                best_state[name].copy_(value)
+        else:
+            stale_epochs += 1
+            if stale_epochs >= patience:
+                print(f"No improvement for {patience} epochs - stopping early.")
+                break
+    model.load_state_dict(best_state)
+    return model
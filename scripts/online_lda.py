@@ -0,0 +1,181 @@
+import json
+import re
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.decomposition import LatentDirichletAllocation
+
+
+# Online variational LDA for corpora that don't fit in memory. Documents are
+# streamed from disk in minibatches, so memory grows with the vocabulary rather
+# than the corpus. The fitted model answers the same calls as a tomotopy
+# LDAModel that the printing and pyLDAvis code use (k, used_vocabs,
+# get_topic_words, get_topic_word_dist, get_count_by_topics).
+def text_files(folders, pattern="**/*.txt", seed=None) -> list:
+    """The files matching 'pattern' in a folder or list of folders, sorted, or
+    shuffled with 'seed' so minibatches don't arrive grouped by folder (label)."""
+    folders = [folders] if isinstance(folders, (str, Path)) else folders
+    files = sorted(f for folder in folders for f in Path(folder).glob(pattern))
+    if seed is not None:
+        np.random.default_rng(seed).shuffle(files)
+    return files
+
+
+def stream_texts(path, text_column="text", chunk_size=1000, pattern="**/*.txt", seed=None):
+    """Yields lists of up to chunk_size texts from a .csv (text_column), a .jsonl
+    (text_column field), a .txt with one document per line, or a folder (or list
+    of folders) of .txt files matching 'pattern'. Files from folders are read in
+    sorted order, or in an order shuffled with 'seed'."""
+    if not isinstance(path, (str, Path)) or Path(path).is_dir():
+        files = text_files(path, pattern, seed)
+        for start in range(0, len(files), chunk_size):
+            yield [f.read_text(encoding="utf-8") for f in files[start : start + chunk_size]]
+        return
+    path = Path(path)
+    if path.suffix == ".csv":
+        for chunk in pd.read_csv(path, usecols=[text_column], chunksize=chunk_size):
+            yield chunk[text_column].fillna("").astype(str).tolist()
+    else:
+        texts = []
+        with open(path, "r", encoding="utf-8") as infile:
+            for line in infile:
+                if not line.strip():
+                    continue
+                texts.append(json.loads(line)[text_column] if path.suffix == ".jsonl" else line.strip())
+                if len(texts) == chunk_size:
+                    yield texts
+                    texts = []
+        if texts:
+            yield texts
+
+
+def simple_tokenizer(text: str) -> list:
+    return re.findall(r"[a-z][a-z']*", text.lower().replace("<br />", " "))
+
+
+class OnlineLDA:
+    """LDA trained by online variational Bayes (scikit-learn) over minibatches from disk.
+
+    The vocabulary is built in one streaming pass, with min_cf, min_df and
+    rm_top applied as in tomotopy, then each training pass streams the corpus
+    again in batches of batch_size documents. Files from folders (those
+    matching 'pattern') are shuffled anew for each pass.
+    """
+
+    def __init__(
+        self,
+        k=10,
+        alpha=0.1,
+        eta=0.01,
+        min_cf=3,
+        min_df=1,
+        rm_top=5,
+        batch_size=1000,
+        passes=1,
+        tokenizer=simple_tokenizer,
+        pattern="**/*.txt",
+        seed=24601,
+    ):
+        self.k = k
+        self.alpha = alpha
+        self.eta = eta
+        self.min_cf = min_cf
+        self.min_df = min_df
+        self.rm_top = rm_top
+        self.batch_size = batch_size
+        self.passes = passes
+        self.tokenizer = tokenizer
+        self.pattern = pattern
+        self.seed = seed
+
+    def _token_batches(self, path, text_column, seed=None):
+        for texts in stream_texts(path, text_column, self.batch_size, self.pattern, seed):
+            yield [self.tokenizer(text) for text in texts]
+
+    def _counts(self, docs: list):
+        indices, indptr = [], [0]
+        for doc in docs:
+            indices.extend(self.vocabulary_[word] for word in doc if word in self.vocabulary_)
+            indptr.append(len(indices))
+        counts = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float64), indices, indptr),
+            shape=(len(docs), len(self.vocabulary_)),
+        )
+        counts.sum_duplicates()
+        return counts
+
+    def build_vocabulary(self, path, text_column="text"):
+        collection, document = Counter(), Counter()
+        self.n_docs_ = 0
+        for docs in self._token_batches(path, text_column):
+            for doc in docs:
+                collection.update(doc)
+                document.update(set(doc))
+            self.n_docs_ += len(docs)
+        kept = [w for w, cf in collection.most_common() if cf >= self.min_cf and document[w] >= self.min_df]
+        self.removed_top_words = kept[: self.rm_top]
+        self.used_vocabs = kept[self.rm_top :]
+        self.used_vocab_freq = np.array([collection[w] for w in self.used_vocabs])
+        self.vocabulary_ = {word: idx for idx, word in enumerate(self.used_vocabs)}
+        return self
+
+    def fit(self, path, text_column="text"):
+        start = time.perf_counter()
+        self.build_vocabulary(path, text_column)
+        print(
+            f"Streaming {self.n_docs_:,} documents, vocab size {len(self.used_vocabs):,} "
+            f"({time.perf_counter() - start:,.0f}s to build)",
+            flush=True,
+        )
+        self.lda_ = LatentDirichletAllocation(
+            n_components=self.k,
+            doc_topic_prior=self.alpha,
+            topic_word_prior=self.eta,
+            learning_method="online",
+            batch_size=self.batch_size,
+            total_samples=self.n_docs_,
+            random_state=self.seed,
+        )
+        for epoch in range(1, self.passes + 1):
+            seen = 0
+            for docs in self._token_batches(path, text_column, seed=self.seed + epoch):
+                self.lda_.partial_fit(self._counts(docs))
+                seen += len(docs)
+            print(
+                f"  Pass {epoch}/{self.passes}: {seen:,} documents "
+                f"({time.perf_counter() - start:,.0f}s elapsed)",
+                flush=True,
+            )
+        return self
+
+    def get_topic_word_dist(self, topic_id) -> np.ndarray:
+        weights = self.lda_.components_[topic_id]
+        return weights / weights.sum()
+
+    def get_topic_words(self, topic_id, top_n=10) -> list:
+        dist = self.get_topic_word_dist(topic_id)
+        return [(self.used_vocabs[i], float(dist[i])) for i in np.argsort(-dist)[:top_n]]
+
+    def get_count_by_topics(self) -> np.ndarray:
+        """Estimated tokens per topic: the topic-word weights minus their eta prior."""
+        return np.maximum(self.lda_.components_.sum(axis=1) - self.eta * len(self.used_vocabs), 0)
+
+    def doc_topic_dists(self, path, text_column="text", output=None) -> np.ndarray:
+        """(n_docs, k) topic distributions for a streamed corpus. With an output .npy
+        path, rows are written to a memory-mapped file instead of held in memory."""
+        n_docs = sum(len(texts) for texts in stream_texts(path, text_column, self.batch_size, self.pattern))
+        if output is not None:
+            dists = np.lib.format.open_memmap(output, mode="w+", dtype=np.float32, shape=(n_docs, self.k))
+        else:
+            dists = np.empty((n_docs, self.k), dtype=np.float32)
+        row = 0
+        for docs in self._token_batches(path, text_column):
+            dists[row : row + len(docs)] = self.lda_.transform(self._counts(docs))
+            row += len(docs)
+        if output is not None:
+            dists.flush()
+        return dists
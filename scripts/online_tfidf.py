@@ -0,0 +1,127 @@
+import hashlib
+from pathlib import Path
+
+import joblib
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+from ml_memory import compact_matrix
+
+
+class IncrementalTfidf:
+    """TF-IDF whose document-frequency counts can absorb new documents.
+
+    partial_fit only reads the new documents: unseen terms are appended to the
+    vocabulary and the idf weights are recomputed from the stored counts. The
+    weighting matches TfidfVectorizer's defaults (smoothed idf, l2 norm), and
+    tokenization options (lowercase, stop_words, ngram_range, ...) are passed
+    through to CountVectorizer. Every absorbed document's id (or a hash of its
+    text) is recorded, and partial_fit skips documents absorbed by an earlier
+    call, so re-running it on the same harvest doesn't count it twice.
+    """
+
+    def __init__(self, dtype=np.float32, **analyzer_options):
+        self.dtype = dtype
+        self.analyzer_options = analyzer_options
+        self.vocabulary_ = {}
+        self.df_ = np.zeros(0, dtype=np.int64)
+        self.n_docs_ = 0
+        self.absorbed_ = set()
+
+    def _analyzer(self):
+        return CountVectorizer(**self.analyzer_options).build_analyzer()
+
+    def fit(self, texts):
+        self.vocabulary_ = {}
+        self.df_ = np.zeros(0, dtype=np.int64)
+        self.n_docs_ = 0
+        self.absorbed_ = set()
+        return self.partial_fit(texts)
+
+    def partial_fit(self, texts, ids=None):
+        """Adds the documents in 'texts' not absorbed before. 'ids' (e.g. DOIs)
+        identify them, and an id repeated within 'texts' is counted once. Without
+        ids a hash of each text is used, and identical texts within one call
+        count as separate documents (as in TfidfVectorizer)."""
+        texts = list(texts)
+        repeats_count = ids is None
+        ids = [hashlib.sha1(str(text).encode("utf-8")).hexdigest() for text in texts] if ids is None else list(ids)
+        absorbed = set(getattr(self, "absorbed_", set()))
+        analyze = self._analyzer()
+        seen = []
+        for text, doc_id in zip(texts, ids):
+            if doc_id in absorbed:
+                continue
+            if not repeats_count:
+                absorbed.add(doc_id)
+            for term in set(analyze(text)):
+                # setdefault appends unseen terms at the end of the vocabulary
+                seen.append(self.vocabulary_.setdefault(term, len(self.vocabulary_)))
+            self.n_docs_ += 1
+        self.df_ = np.concatenate(
+            [self.df_, np.zeros(len(self.vocabulary_) - len(self.df_), dtype=np.int64)]
+        )
+        np.add.at(self.df_, np.array(seen, dtype=np.int64), 1)
+        self.absorbed_ = absorbed | set(ids)
+        return self
+
+    @property
+    def idf_(self) -> np.ndarray:
+        return np.log((1 + self.n_docs_) / (1 + self.df_)) + 1
+
+    def _weighted(self, texts, n_features):
+        analyze = self._analyzer()
+        n_features = len(self.vocabulary_) if n_features is None else n_features
+        indices, indptr = [], [0]
+        for text in texts:
+            terms = (self.vocabulary_.get(term) for term in analyze(text))
+            indices.extend(t for t in terms if t is not None and t < n_features)
+            indptr.append(len(indices))
+        counts = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=self.dtype), indices, indptr),
+            shape=(len(indptr) - 1, n_features),
+        )
+        counts.sum_duplicates()
+        return counts @ sparse.diags(self.idf_[:n_features].astype(self.dtype))
+
+    def _normalized(self, weighted):
+        if weighted.shape[0] == 0:
+            return compact_matrix(sparse.csr_matrix(weighted), dtype=self.dtype)
+        return compact_matrix(normalize(weighted), dtype=self.dtype)
+
+    def transform(self, texts, n_features=None):
+        """TF-IDF rows for 'texts' under the current statistics. Pass n_features to
+        keep only the first n_features terms, i.e. the vocabulary a model was trained on."""
+        n_features = len(self.vocabulary_) if n_features is None else n_features
+        return self._normalized(self._weighted(texts, n_features))
+
+    def transform_to(self, texts, vocabulary: dict):
+        """TF-IDF rows for 'texts' under the current statistics, with columns ordered by
+        another vectorizer's vocabulary_ (e.g. a saved bundle's TfidfVectorizer) so its
+        classifier can score them. Terms the statistics haven't seen get no weight."""
+        pairs = [(self.vocabulary_[term], column) for term, column in vocabulary.items() if term in self.vocabulary_]
+        rows, columns = zip(*pairs) if pairs else ((), ())
+        select = sparse.csr_matrix(
+            (np.ones(len(pairs), dtype=self.dtype), (rows, columns)),
+            shape=(len(self.vocabulary_), len(vocabulary)),
+        )
+        return self._normalized(self._weighted(texts, len(self.vocabulary_)) @ select)
+
+    def fit_transform(self, texts):
+        texts = list(texts)
+        return self.fit(texts).transform(texts)
+
+    def get_feature_names_out(self) -> np.ndarray:
+        names = np.empty(len(self.vocabulary_), dtype=object)
+        for term, idx in self.vocabulary_.items():
+            names[idx] = term
+        return names
+
+    def save(self, path):
+        joblib.dump(self, Path(path))
+
+    @staticmethod
+    def load(path) -> "IncrementalTfidf":
+        return joblib.load(Path(path))
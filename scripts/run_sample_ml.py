@@ -17,10 +17,33 @@ from sklearn import linear_model, naive_bayes, svm
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics import accuracy_score, matthews_corrcoef
+from sklearn.pipeline import make_pipeline
 from sklearn.model_selection import GridSearchCV
-from torch.utils.data import DataLoader, Dataset, random_split
+from torch.utils.data import Dataset, random_split
 
 from dict_analysis import read_dictionary, get_count
+from glove_store import load_glove
+from lda_coherence import build_index
+from lda_sweep import build_corpus, train_lda, train_to_convergence
+from lda_vis import prepare_model
+from ml_budget import fit_with_budget
+from ml_bundle import save_bundle
+from ml_evaluate import compare_models
+from ml_memory import compact_matrix, memory_report
+from ml_refit import FitCache
+from ml_search import candidate_list, print_search, run_search
+from ml_select import SELECTION_METHODS, ColumnSelector, k_report, rank_features
+from ngram_classifier import (
+    BagOfNgramsClassifier,
+    EncodedDataset,
+    build_vocab,
+    make_loader,
+    n_ids,
+    predict,
+    train_classifier,
+)
+from online_lda import OnlineLDA, simple_tokenizer
+from soft_dictionary import soft_dictionary_scores
 
 warnings.simplefilter("ignore", category=DeprecationWarning)
 
@@ -93,13 +116,17 @@ train_size = int(0.8 * len(full_train_dataset))
 val_size = len(full_train_dataset) - train_size
 train_dataset, val_dataset = random_split(full_train_dataset, [train_size, val_size])
 
-train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
-val_loader = DataLoader(val_dataset, batch_size=batch_size, shuffle=False)
-test_loader = DataLoader(test_dataset, batch_size=batch_size, shuffle=False)
-
 full_train_data = dataset_to_dataframe(train_dataset)
 full_validation_data = dataset_to_dataframe(val_dataset)
 full_test_data = dataset_to_dataframe(test_dataset)
+memory_report(
+    "loading the dataset",
+    full_train_dataset=full_train_dataset,
+    test_dataset=test_dataset,
+    full_train_data=full_train_data,
+    full_validation_data=full_validation_data,
+    full_test_data=full_test_data,
+)
 
 # Generating 3000 Row Test Dataset Subsample (for demonstration time-saving purposes)
 np.random.seed(seed)
@@ -259,6 +286,31 @@ print(
 print(
     f"The correlation between sentiment and the coefficient of imbalance is  {coi_pbsr[0]:.02}; p = {coi_pbsr[1]:.03}"
 )
+glove_file = Path.cwd() / "models" / "glove.6B.100d.txt"
+if glove_file.exists():
+    print(
+        f"\n====Soft dictionary scores from GloVe embeddings==== - {datetime.now()}",
+        flush=True,
+    )
+    print(
+        "Exact counts miss words that are close in meaning to the dictionary words. "
+        "A soft score compares each review's TF-IDF-weighted average word vector "
+        "with the average vector of each dictionary's words:\n"
+    )
+    soft_scores = soft_dictionary_scores(
+        load_glove(glove_file),
+        test_data["review_tokens"].tolist(),
+        {
+            "positivity_soft_henry_08": dictionaries["Tone_Positivity_Henry08"]["words"],
+            "negativity_soft_henry_08": dictionaries["Tone_Negativity_Henry08"]["words"],
+        },
+    )
+    for column in soft_scores.columns:
+        test_data[column] = soft_scores[column].to_numpy()
+        soft_pbsr = pointbiserialr(x=test_data["sentiment"], y=test_data[column])
+        print(
+            f"The correlation between sentiment and {column} is {soft_pbsr[0]:.02}; p = {soft_pbsr[1]:.03}"
+        )
 _ = input("Press Enter to continue...")
 print("\n\n")
 print(
@@ -472,10 +524,117 @@ print(
     "between positive and negative sentiment in text. However, before we can "
     "do that, we must first figuratively teach the computer to read."
 )
-vectorizer = TfidfVectorizer(max_features=10000)
-x_train_tfidf = vectorizer.fit_transform(full_train_data["review"])
-x_validation_tfidf = vectorizer.transform(full_validation_data["review"])
-x_test_tfidf = vectorizer.transform(full_test_data["review"])
+# float32 values and int32 indices take half the memory of scikit-learn's defaults
+vectorizer = TfidfVectorizer(max_features=10000, dtype=np.float32)
+x_train_tfidf = compact_matrix(vectorizer.fit_transform(full_train_data["review"]))
+x_validation_tfidf = compact_matrix(vectorizer.transform(full_validation_data["review"]))
+x_test_tfidf = compact_matrix(vectorizer.transform(full_test_data["review"]))
+memory_report(
+    "tf-idf featurization",
+    x_train_tfidf=x_train_tfidf,
+    x_validation_tfidf=x_validation_tfidf,
+    x_test_tfidf=x_test_tfidf,
+    test_data=test_data,
+)
+# Reuses earlier fits when hyperparameters are revisited or only nudged
+fit_cache = FitCache()
+models_path = Path.cwd() / "output" / "models"
+
+
+feature_rankings = {}
+selected_matrices = {}
+
+
+def feature_columns(hyperparameters):
+    """Top-k tf-idf columns for the model's 'feature_k' setting (None keeps all of them)."""
+    method = hyperparameters.get("feature_method", "chi2")
+    k = hyperparameters.get("feature_k", 0)
+    if not k or k >= x_train_tfidf.shape[1]:
+        return None
+    if method not in feature_rankings:
+        print(f"Ranking terms by {method}...", flush=True)
+        feature_rankings[method] = rank_features(
+            x_train_tfidf, full_train_data["sentiment"], method, seed
+        )
+    return np.sort(feature_rankings[method][:k])
+
+
+def selected_features(hyperparameters):
+    """Training, validation and test matrices restricted to feature_columns()."""
+    columns = feature_columns(hyperparameters)
+    if columns is None:
+        return x_train_tfidf, x_validation_tfidf, x_test_tfidf
+    key = (hyperparameters["feature_method"], len(columns))
+    # Keep one copy per selection so refits (and the fit cache) reuse it
+    if key not in selected_matrices:
+        selected_matrices[key] = tuple(
+            x[:, columns] for x in (x_train_tfidf, x_validation_tfidf, x_test_tfidf)
+        )
+    return selected_matrices[key]
+
+
+def compare_feature_counts(estimator, hyperparameters, ks=(100, 300, 1000, 3000, 10000)):
+    method = hyperparameters["feature_method"]
+    print(
+        f"\n====Comparing the top {', '.join(map(str, ks))} terms by {method}==== - {datetime.now()}",
+        flush=True,
+    )
+    if method not in feature_rankings:
+        feature_rankings[method] = rank_features(
+            x_train_tfidf, full_train_data["sentiment"], method, seed
+        )
+    report = k_report(
+        estimator,
+        feature_rankings[method],
+        ks,
+        x_train_tfidf,
+        full_train_data["sentiment"],
+        x_validation_tfidf,
+        full_validation_data["sentiment"],
+    )
+    print(report.to_string(index=False, float_format="{:.4f}".format))
+    best_k = int(report.loc[report["score"].idxmax(), "k"])
+    hyperparameters["feature_k"] = 0 if best_k >= x_train_tfidf.shape[1] else best_k
+    print(f"Using the top {best_k} terms (best validation accuracy).")
+
+
+def bundle_model(folder, name, classifier, hyperparameters, accuracy, phi):
+    columns = feature_columns(hyperparameters)
+    bundle_dir = save_bundle(
+        models_path / folder,
+        vectorizer if columns is None else make_pipeline(vectorizer, ColumnSelector(columns)),
+        classifier,
+        name=name,
+        class_names=class_names,
+        hyperparameters=hyperparameters,
+        test_accuracy=accuracy,
+        test_phi=phi,
+    )
+    print(
+        f"{name} saved to {bundle_dir} - score new texts with: "
+        f"python ml_bundle.py predict {bundle_dir} <texts.csv> <predictions.csv>"
+    )
+
+
+def search_hyperparameters(estimator, space, hyperparameters, halving=False):
+    print(
+        f"\n====Searching {len(candidate_list(space))} hyperparameter combinations on the validation set==== - {datetime.now()}",
+        flush=True,
+    )
+    x_train, x_validation, _ = selected_features(hyperparameters)
+    results = run_search(
+        estimator,
+        space,
+        x_train,
+        full_train_data["sentiment"],
+        x_validation,
+        full_validation_data["sentiment"],
+        halving=halving,
+    )
+    print_search(results)
+    hyperparameters.update(results["params"].iloc[0])
+    print("The best combination will now be refit on the full training set.")
+
 
 print(
     "\n\nLogistic Regression: This technique should sound familiar. This "
@@ -489,6 +648,12 @@ hyperparameters = {
     "C": 1,
     "solver": "lbfgs",
     "max_iter": 100,
+    "time_budget": 0,  # Stop adding solver iterations after about this many seconds - integer (0 = no limit)
+}
+lr_search_space = {
+    "C": [0.1, 1.0, 10.0, 100.0],
+    "solver": ["lbfgs", "liblinear", "saga"],
+    "max_iter": [100, 500],
 }
 while True:
     print(f"\n====~~~~~HYPERPARAMETERS~~~~~==== - {datetime.now()}", flush=True)
@@ -505,7 +670,15 @@ while True:
         max_iter=hyperparameters["max_iter"],
         n_jobs=-1,
     )
-    lr_classifier.fit(x_train_tfidf, full_train_data["sentiment"])
+    if hyperparameters["time_budget"]:
+        lr_classifier, _ = fit_with_budget(
+            lr_classifier, x_train_tfidf, full_train_data["sentiment"], hyperparameters["time_budget"]
+        )
+    else:
+        lr_classifier, fit_source = fit_cache.fit(
+            lr_classifier, x_train_tfidf, full_train_data["sentiment"]
+        )
+        print(f"Model fit: {fit_source}")
     lr_predictions = lr_classifier.predict(x_test_tfidf)
 
     print(
@@ -519,7 +692,13 @@ while True:
     print(f"Logistic Regression phi coefficient (correlation): {lr_phi:.02}")
 
     print("\n\nWould you like to try different hyperparameters?")
-    if input("Enter 'y' to try different hyperparameters: ").lower() != "y":
+    choice = input(
+        "Enter 'y' to try different hyperparameters or 's' to search several at once: "
+    ).lower()
+    if choice == "s":
+        search_hyperparameters(linear_model.LogisticRegression(), lr_search_space, hyperparameters)
+        continue
+    if choice != "y":
         break
     while True:
         print("Which hyperparameter would you like to change?")
@@ -551,6 +730,9 @@ while True:
             ):
                 print("Invalid value. Please try again.")
                 continue
+            if hyperparameter == "time_budget" and not new_value.isdigit():
+                print("Invalid value. Please try again.")
+                continue
             hyperparameters[hyperparameter] = type(hyperparameters[hyperparameter])(
                 new_value
             )
@@ -562,6 +744,8 @@ while True:
             break
 
 
+bundle_model("logistic_regression", "Logistic Regression", lr_classifier, hyperparameters, lr_accuracy, lr_phi)
+
 print(
     "\n\nNaïve Bayes: Like with logistic regression, you have likely worked with "
     "a foundational component of the naïve Bayes classifier in statistics."
@@ -571,6 +755,7 @@ print(
     "P(words|classification), P(classification), and P(words)."
 )
 hyperparameters = {"alpha": 1.00, "fit_prior": True}
+nb_search_space = {"alpha": [0.01, 0.1, 0.5, 1.0, 2.0], "fit_prior": [True, False]}
 while True:
     print(f"\n====~~~~~HYPERPARAMETERS~~~~~==== - {datetime.now()}", flush=True)
     print(hyperparameters)
@@ -579,7 +764,10 @@ while True:
     nb_classifier = naive_bayes.MultinomialNB(
         alpha=hyperparameters["alpha"], fit_prior=hyperparameters["fit_prior"]
     )
-    nb_classifier.fit(x_train_tfidf, full_train_data["sentiment"])
+    nb_classifier, fit_source = fit_cache.fit(
+        nb_classifier, x_train_tfidf, full_train_data["sentiment"]
+    )
+    print(f"Model fit: {fit_source}")
     nb_predictions = nb_classifier.predict(x_test_tfidf)
 
     print(
@@ -593,7 +781,13 @@ while True:
     print(f"Naive Bayes' phi coefficient (correlation): {nb_phi:.02}")
 
     print("\n\nWould you like to try different hyperparameters?")
-    if input("Enter 'y' to try different hyperparameters: ").lower() != "y":
+    choice = input(
+        "Enter 'y' to try different hyperparameters or 's' to search several at once: "
+    ).lower()
+    if choice == "s":
+        search_hyperparameters(naive_bayes.MultinomialNB(), nb_search_space, hyperparameters)
+        continue
+    if choice != "y":
         break
     while True:
         print("Which hyperparameter would you like to change?")
@@ -614,6 +808,8 @@ while True:
         if input("Enter 'y' to change another hyperparameter: ").lower() != "y":
             break
 
+bundle_model("naive_bayes", "Naive Bayes", nb_classifier, hyperparameters, nb_accuracy, nb_phi)
+
 print(
     "\n\nRandom Forest: The random forest classifier is what is called an "
     "'ensemble' classifier. That is, the random forest classifier actually "
@@ -629,6 +825,14 @@ hyperparameters = {
     "max_depth": 500,
     "min_samples_split": 2,  # Minimum number of texts in the branch when a split is made - integer (technically you can have a float, but stick with integer)
     "min_samples_leaf": 1,  # Minimum number of texts in a leaf on the decision tree - integer (technically you can have a float, but stick with integer)
+    "feature_k": 0,  # Keep only the k most discriminative terms - integer (0 keeps all 10,000)
+    "feature_method": "chi2",  # How terms are ranked for feature_k - chi2, mutual_info, or l1
+    "time_budget": 0,  # Stop training after about this many seconds and keep the partial forest - integer (0 = no limit)
+}
+rf_search_space = {
+    "n_estimators": [100, 300],
+    "max_depth": [50, 200, 500],
+    "min_samples_leaf": [1, 2, 5],
 }
 while True:
     print(f"\n====~~~~~HYPERPARAMETERS~~~~~==== - {datetime.now()}", flush=True)
@@ -645,8 +849,17 @@ while True:
         min_samples_leaf=hyperparameters["min_samples_leaf"],
         n_jobs=-1,
     )
-    rf_classifier.fit(x_train_tfidf, full_train_data["sentiment"])
-    rf_predictions = rf_classifier.predict(x_test_tfidf)
+    x_train_rf, _, x_test_rf = selected_features(hyperparameters)
+    if hyperparameters["time_budget"]:
+        rf_classifier, _ = fit_with_budget(
+            rf_classifier, x_train_rf, full_train_data["sentiment"], hyperparameters["time_budget"]
+        )
+    else:
+        rf_classifier, fit_source = fit_cache.fit(
+            rf_classifier, x_train_rf, full_train_data["sentiment"]
+        )
+        print(f"Model fit: {fit_source}")
+    rf_predictions = rf_classifier.predict(x_test_rf)
 
     print(
         f"\n====Estimate and print the accuracy and phi coefficient for the random forest classifier==== - {datetime.now()}",
@@ -659,7 +872,17 @@ while True:
     print(f"Random Forest phi coefficient (correlation): {rf_phi:.02}")
 
     print("\n\nWould you like to try different hyperparameters?")
-    if input("Enter 'y' to try different hyperparameters: ").lower() != "y":
+    choice = input(
+        "Enter 'y' to try different hyperparameters, 's' to search several at once "
+        "or 'k' to compare numbers of terms: "
+    ).lower()
+    if choice == "s":
+        search_hyperparameters(RandomForestClassifier(), rf_search_space, hyperparameters, halving=True)
+        continue
+    if choice == "k":
+        compare_feature_counts(rf_classifier, hyperparameters)
+        continue
+    if choice != "y":
         break
     while True:
         print("Which hyperparameter would you like to change?")
@@ -673,6 +896,12 @@ while True:
             if hyperparameter == "criterion" and new_value not in ["gini", "entropy"]:
                 print("Invalid value. Please try again.")
                 continue
+            if hyperparameter == "feature_method" and new_value not in SELECTION_METHODS:
+                print("Invalid value. Please try again.")
+                continue
+            if hyperparameter in ("feature_k", "time_budget") and not new_value.isdigit():
+                print("Invalid value. Please try again.")
+                continue
             if (
                 hyperparameter == "n_estimators"
                 or hyperparameter == "max_depth"
@@ -692,6 +921,8 @@ while True:
             break
 
 
+bundle_model("random_forest", "Random Forest", rf_classifier, hyperparameters, rf_accuracy, rf_phi)
+
 print(
     "\n\nSupport Vector Machine: The support vector machine has become a very"
     " popular classifier for its flexibility. It handles high feature/sample"
@@ -705,7 +936,15 @@ hyperparameters = {
     'kernel': "linear",
     'degree': 3,
     'gamma': "auto",
+    'feature_k': 0,
+    'feature_method': "chi2",
+    'time_budget': 0,
 }
+# gamma has no effect on a linear kernel, so it is only searched with rbf
+svm_search_space = [
+    {"C": [0.1, 1.0, 10.0], "kernel": ["linear"]},
+    {"C": [0.1, 1.0, 10.0], "kernel": ["rbf"], "gamma": ["auto", "scale"]},
+]
 while True:
     print(f"\n====~~~~~HYPERPARAMETERS~~~~~==== - {datetime.now()}", flush=True)
 
@@ -715,8 +954,17 @@ while True:
         flush=True,
     )
     svm_classifier = svm.SVC(C=hyperparameters['C'], kernel=hyperparameters['kernel'], degree=hyperparameters['degree'], gamma=hyperparameters['gamma'])
-    svm_classifier.fit(x_train_tfidf, full_train_data["sentiment"])
-    svm_predictions = svm_classifier.predict(x_test_tfidf)
+    x_train_svm, _, x_test_svm = selected_features(hyperparameters)
+    if hyperparameters["time_budget"]:
+        svm_classifier, _ = fit_with_budget(
+            svm_classifier, x_train_svm, full_train_data["sentiment"], hyperparameters["time_budget"]
+        )
+    else:
+        svm_classifier, fit_source = fit_cache.fit(
+            svm_classifier, x_train_svm, full_train_data["sentiment"]
+        )
+        print(f"Model fit: {fit_source}")
+    svm_predictions = svm_classifier.predict(x_test_svm)
 
 
     print(
@@ -730,7 +978,17 @@ while True:
     print(f"Support Vector Machine phi coefficient (correlation): {svm_phi:.02}")
 
     print("\n\nWould you like to try different hyperparameters?")
-    if input("Enter 'y' to try different hyperparameters: ").lower() != "y":
+    choice = input(
+        "Enter 'y' to try different hyperparameters, 's' to search several at once "
+        "or 'k' to compare numbers of terms: "
+    ).lower()
+    if choice == "s":
+        search_hyperparameters(svm.SVC(), svm_search_space, hyperparameters, halving=True)
+        continue
+    if choice == "k":
+        compare_feature_counts(svm_classifier, hyperparameters)
+        continue
+    if choice != "y":
         break
     while True:
         print("Which hyperparameter would you like to change?")
@@ -744,6 +1002,12 @@ while True:
             if hyperparameter == "kernel" and new_value not in ["linear", "poly", "rbf", "sigmoid"]:
                 print("Invalid value. Please try again.")
                 continue
+            if hyperparameter == "feature_method" and new_value not in SELECTION_METHODS:
+                print("Invalid value. Please try again.")
+                continue
+            if hyperparameter in ("feature_k", "time_budget") and not new_value.isdigit():
+                print("Invalid value. Please try again.")
+                continue
             if (
                 hyperparameter == "C"
                 or hyperparameter == "degree"
@@ -769,6 +1033,49 @@ while True:
         if input("Enter 'y' to change another hyperparameter: ").lower() != "y":
             break
 
+bundle_model("svm", "Support Vector Machine", svm_classifier, hyperparameters, svm_accuracy, svm_phi)
+
+print(
+    "\n\nBag-of-n-grams Neural Network: This is a small neural network in the "
+    "style of Facebook's fastText. Each review is turned into a 'bag' of its "
+    "words and word pairs (bigrams), the network learns a short vector for "
+    "each of them, averages those vectors for the review, and classifies the "
+    "average. It trains in passes ('epochs') over the training set and stops "
+    "once accuracy on the validation set stops improving."
+)
+print(f"\n====Encode the reviews as word and bigram ids==== - {datetime.now()}", flush=True)
+ngram_buckets = 200_000
+ngram_vocab = build_vocab(text for text, _ in train_dataset)
+loader_workers = min(4, max((os.cpu_count() or 1) - 1, 0))
+encoded_train = EncodedDataset(train_dataset, ngram_vocab, ngram_buckets)
+encoded_val = EncodedDataset(val_dataset, ngram_vocab, ngram_buckets)
+encoded_test = EncodedDataset(test_dataset, ngram_vocab, ngram_buckets)
+memory_report(
+    "n-gram encoding",
+    ngram_vocab=ngram_vocab,
+    encoded_train=encoded_train,
+    encoded_val=encoded_val,
+    encoded_test=encoded_test,
+)
+train_loader = make_loader(encoded_train, batch_size, shuffle=True, num_workers=loader_workers)
+val_loader = make_loader(encoded_val, 256, num_workers=loader_workers)
+test_loader = make_loader(encoded_test, 256, num_workers=loader_workers)
+print(f"\n====Train the bag-of-n-grams classifier==== - {datetime.now()}", flush=True)
+torch.manual_seed(seed)
+ngram_classifier = train_classifier(
+    BagOfNgramsClassifier(n_ids(ngram_vocab, ngram_buckets), len(class_names)),
+    train_loader,
+    val_loader,
+    device="cuda" if torch.cuda.is_available() else "cpu",
+)
+ngram_predictions, ngram_labels = predict(
+    ngram_classifier, test_loader, next(ngram_classifier.parameters()).device
+)
+ngram_accuracy = accuracy_score(ngram_predictions, ngram_labels)
+ngram_phi = matthews_corrcoef(ngram_predictions, ngram_labels)
+print(f"Bag-of-n-grams accuracy: {ngram_accuracy:.2%}")
+print(f"Bag-of-n-grams phi coefficient (correlation): {ngram_phi:.02}")
+
 print(
     "\n\nA Final Comparison: This wraps up the comparison of the sentiment analysis "
     "machine learning classification algorithms. As I hope you've seen, this "
@@ -792,25 +1099,25 @@ print(
 print(
     f"The correlation between sentiment and the coefficient of imbalance is...... ORIGINAL: {coi_pbsr[0]:.02}; p = {coi_pbsr[1]:.02e} --- CUSTOM: {cus_coi_pbsr[0]:.02}; p = {cus_coi_pbsr[1]:.02e}"
 )
+print(f"{'-'*120}")
 print(
-    f"The Logistic Regression phi coefficient (correlation) with sentiment is.............. {lr_phi:.02}"
-)
-print(
-    f"The Naive Bayes' phi coefficient (correlation) with sentiment is..................... {nb_phi:.02}"
-)
-print(
-    f"The Random Forest phi coefficient (correlation) with sentiment is.................... {rf_phi:.02}"
-)
-print(
-    f"The Support Vector Machine phi coefficient (correlation) with sentiment is........... {svm_phi:.02}"
+    f"\n====Bootstrapping 95% intervals and paired tests for the classifiers==== - {datetime.now()}",
+    flush=True,
 )
-
-print(f"{'-'*120}")
-print("ACCURACIES:")
-print(f"Logistic Regression accuracy................... {lr_accuracy:.2%}")
-print(f"Naive Bayes' accuracy.......................... {nb_accuracy:.2%}")
-print(f"Random Forest accuracy......................... {rf_accuracy:.2%}")
-print(f"Support Vector Machine accuracy................ {svm_accuracy:.2%}")
+model_table, pair_table = compare_models(
+    full_test_data["sentiment"],
+    {
+        "Logistic Regression": lr_predictions,
+        "Naive Bayes": nb_predictions,
+        "Random Forest": rf_predictions,
+        "Support Vector Machine": svm_predictions,
+        "Bag-of-n-grams": ngram_predictions,
+    },
+)
+print("CLASSIFIERS (phi = mcc):")
+print(model_table.to_string(index=False, float_format="{:.3f}".format))
+print("\nPAIRED COMPARISONS (accuracy difference and McNemar's test):")
+print(pair_table.to_string(index=False, float_format="{:.3g}".format))
 _ = input("Press Enter to continue...")
 print("\n\n")
 print("=" * 50)
@@ -863,6 +1170,40 @@ hyperparameters = {
     'alpha': 0.1,
     'eta': 0.01,
 }
+lda_search_space = {"k": [5, 10, 15, 20], "alpha": [0.1, 0.5], "eta": [0.01, 0.1]}
+
+
+def search_topic_models(space, hyperparameters, coherence="u_mass"):
+    candidates = candidate_list(space)
+    print(
+        f"\n====Searching {len(candidates)} topic models by {coherence} coherence==== - {datetime.now()}",
+        flush=True,
+    )
+    base_params = {
+        "tw": hyperparameters["term_weight"],
+        "min_cf": hyperparameters["min_cf"],
+        "min_df": hyperparameters["min_df"],
+        "rm_top": hyperparameters["rm_top"],
+        "k": hyperparameters["k"],
+        "alpha": hyperparameters["alpha"],
+        "eta": hyperparameters["eta"],
+    }
+    rows = []
+    # One model at a time: tomotopy already trains each model on every core
+    for params in candidates:
+        mdl, score, _ = train_lda(lda_corpus, {**base_params, **params}, 1000, coherence=coherence, index=lda_index)
+        rows.append({**params, "coherence": score, "iterations": mdl.global_step})
+        print(f"  {params}: {coherence} coherence {score:.4f} after {mdl.global_step} iterations", flush=True)
+    results = pd.DataFrame(rows).sort_values("coherence", ascending=False)
+    print(results.to_string(index=False, float_format="{:.4f}".format))
+    hyperparameters.update(candidates[results.index[0]])
+    print("The most coherent combination will now be retrained.")
+
+
+# The reviews are indexed once; each model below is built from the same corpus
+lda_corpus = build_corpus(test_data["review_tokens"], Path.cwd() / "output")
+# Document co-occurrence counts for scoring the coherence of searched models
+lda_index = build_index(test_data["review_tokens"], Path.cwd() / "output")
 while True:
     print(f"\n====~~~~~HYPERPARAMETERS~~~~~==== - {datetime.now()}", flush=True)
     print(hyperparameters)
@@ -876,9 +1217,8 @@ while True:
         alpha=hyperparameters['alpha'],
         eta=hyperparameters['eta'],
         k=hyperparameters['k'],
+        corpus=lda_corpus,
     )
-    for review_text in test_data["review_tokens"]:
-        model.add_doc(review_text)
     model.burn_in = 100
     model.train(0)
     print(
@@ -891,14 +1231,13 @@ while True:
     )
     print("Removed top words:", model.removed_top_words)
     print("Training...", file=sys.stderr, flush=True)
-    model.train(1000)
-
-    topic_term_dists = np.stack([model.get_topic_word_dist(k) for k in range(model.k)])
-    doc_topic_dists = np.stack([doc.get_topic_dist() for doc in model.docs])
-    doc_topic_dists /= doc_topic_dists.sum(axis=1, keepdims=True)
-    doc_lengths = np.array([len(doc.words) for doc in model.docs])
-    vocab = list(model.used_vocabs)
-    term_frequency = model.used_vocab_freq
+    # Trains in chunks of 50 iterations and stops once the log-likelihood levels off
+    training_curve = train_to_convergence(model, max_iterations=1000)
+    print(
+        f"Stopped after {model.global_step} iterations, "
+        f"log-likelihood per word {model.ll_per_word:.4f}"
+    )
+    print(training_curve.to_string(index=False))
 
     for k in range(model.k):
         print(f"Topic #{k}")
@@ -906,7 +1245,13 @@ while True:
             print("\t", word, prob, sep="\t")
 
     print("\n\nWould you like to try different hyperparameters?")
-    if input("Enter 'y' to try different hyperparameters: ").lower() != "y":
+    choice = input(
+        "Enter 'y' to try different hyperparameters or 's' to search several at once: "
+    ).lower()
+    if choice == "s":
+        search_topic_models(lda_search_space, hyperparameters)
+        continue
+    if choice != "y":
         break
     while True:
         print("Which hyperparameter would you like to change?")
@@ -949,16 +1294,32 @@ while True:
         if input("Enter 'y' to change another hyperparameter: ").lower() != "y":
             break
 
+print(
+    "\n\nThe model above only sees the 3,000-review sample, because tomotopy holds "
+    "every document in memory. An online LDA can instead stream all of the "
+    "training reviews from disk in minibatches, so corpus size is limited by "
+    "disk rather than RAM."
+)
+if input("Enter 'y' to train a streaming LDA on every training review: ").lower() == "y":
+    print(f"\n====Train streaming online LDA==== - {datetime.now()}", flush=True)
+    model = OnlineLDA(
+        k=hyperparameters['k'],
+        alpha=hyperparameters['alpha'],
+        eta=hyperparameters['eta'],
+        min_cf=hyperparameters['min_cf'],
+        min_df=hyperparameters['min_df'],
+        rm_top=hyperparameters['rm_top'],
+        tokenizer=lambda text: [word for word in simple_tokenizer(text) if word not in stops],
+    ).fit([train_dir / "neg", train_dir / "pos"])
+    print("Removed top words:", model.removed_top_words)
+    for k in range(model.k):
+        print(f"Topic #{k}")
+        for word, prob in model.get_topic_words(k):
+            print("\t", word, prob, sep="\t")
+
 print(f"\n====Generate pyLDAvis plot==== - {datetime.now()}", flush=True)
-prepared_data = pyLDAvis.prepare(
-    topic_term_dists,
-    doc_topic_dists,
-    doc_lengths,
-    vocab,
-    term_frequency,
-    start_index=1,
-    sort_topics=False,
-)
+# Relevance is ranked over each topic's 1,000 most probable terms
+prepared_data = prepare_model(model, top_n=1000, sort_topics=False, start_index=1)
 filename = str(Path.cwd() / "output" / "pyLDAvis_LDA.html")
 pyLDAvis.save_html(prepared_data, filename)
 print(f"pyLDAvis plot saved to {filename} - download it to your computer to view.")
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from dictionary_expansion import centroid_matrix
+from embedding_similarity import unit_rows
+
+
+# Soft dictionary scores: instead of counting exact dictionary words, each
+# document is represented by the TF-IDF-weighted average of its word vectors and
+# scored by its cosine similarity to each dictionary's embedding centroid. With
+# a sparse (documents x words) TF-IDF matrix and a (words x dimensions) embedding
+# matrix, all documents and dictionaries take two matrix products.
+def tfidf_matrix(docs, vocabulary: list):
+    """Sparse TF-IDF weights of the 'vocabulary' words in tokenized docs (lists of
+    tokens). Rows are left unnormalized: they only weight the average vector."""
+    vectorizer = TfidfVectorizer(analyzer=list, vocabulary=vocabulary, norm=None, dtype=np.float32)
+    return vectorizer.fit_transform(docs)
+
+
+def document_vectors(store, docs) -> tuple:
+    """(vocabulary, unit-length TF-IDF-weighted mean vectors) for tokenized docs.
+    Documents without any word in 'store' get a row of zeros."""
+    docs = list(docs)
+    vocabulary = sorted({word for doc in docs for word in doc if word in store})
+    if not vocabulary:
+        return vocabulary, np.zeros((len(docs), store.vector_size), dtype=np.float32)
+    embeddings = np.asarray(store.vectors[[store.key_to_index[word] for word in vocabulary]])
+    return vocabulary, unit_rows(tfidf_matrix(docs, vocabulary) @ embeddings)
+
+
+def soft_dictionary_scores(store, docs, seed_sets: dict) -> pd.DataFrame:
+    """(documents x dictionaries) cosine similarities between each document's
+    TF-IDF-weighted mean vector and each dictionary's centroid. 'seed_sets' maps
+    dictionary names to word lists; wildcards are dropped from the end of words
+    ('abandon*' -> 'abandon') and words without embeddings are ignored. Documents
+    with no embedded words score 0; dictionaries with none score NaN."""
+    seed_sets = {name: [word.rstrip("*") for word in words] for name, words in seed_sets.items()}
+    docs = list(docs)
+    scores = pd.DataFrame(np.nan, index=range(len(docs)), columns=list(seed_sets), dtype=np.float32)
+    embedded = {name: words for name, words in seed_sets.items() if any(word in store for word in words)}
+    for name in [name for name in seed_sets if name not in embedded]:
+        print(f"'{name}' has no words with embeddings; its scores are NaN.")
+    if embedded:
+        names, centroids = centroid_matrix(store, embedded)
+        _, vectors = document_vectors(store, docs)
+        scores[names] = vectors @ centroids.T
+    return scores